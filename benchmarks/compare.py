@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+"""Compare the throughput of two benchmark result files
+
+Usage: python -m benchmarks.compare baseline.json results.json
+"""
+from __future__ import unicode_literals, print_function, absolute_import
+
+import json
+import sys
+
+
+def load_rates(path):
+    with open(path) as f:
+        return dict((r['name'], r['records_per_sec']) for r in json.load(f)['results'])
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 2:
+        print(__doc__.strip().splitlines()[-1], file=sys.stderr)
+        return 2
+
+    baseline, current = load_rates(argv[0]), load_rates(argv[1])
+    for name in sorted(set(baseline) & set(current)):
+        change = (current[name] / baseline[name] - 1) * 100
+        print('{0:<32} {1:>12.0f} {2:>12.0f} {3:>+8.1f}%'.format(
+            name, baseline[name], current[name], change))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""Deterministic generation of synthetic datasets with their JSON schema
+"""
+from __future__ import unicode_literals, print_function, absolute_import
+
+import random
+
+
+LEAF_TYPES = ('string', 'number', 'integer', 'boolean')
+
+WORDS = ('lorem', 'ipsum', 'dolor', 'sit', 'amet', 'consectetur', 'adipiscing',
+         'elit', 'sed', 'do', 'eiusmod', 'tempor', 'incididunt', 'ut', 'labore')
+
+
+def generate_schema(width=10, depth=1, array_density=0.2, array_items='string',
+                    serialize=None, seed=0):
+    """Return a JSON schema for objects with `width` properties per level,
+    the first of them nested objects down to `depth` levels. About
+    `array_density` of the other properties are arrays, of strings or
+    of objects with string values (as `array_items`), serialized with the
+    `serialize` method (or the default JSON serialization).
+    """
+    rnd = random.Random(seed)
+    return _object_schema(rnd, width, depth, array_density, array_items, serialize)
+
+
+def _object_schema(rnd, width, depth, array_density, array_items, serialize):
+    properties = {}
+    for i in range(width):
+        name = 'field%d' % i
+        if i == 0 and depth > 0:
+            properties[name] = _object_schema(rnd, width, depth - 1, array_density,
+                                              array_items, serialize)
+        elif rnd.random() < array_density:
+            properties[name] = _array_schema(array_items, serialize)
+        else:
+            properties[name] = {'type': rnd.choice(LEAF_TYPES)}
+    return {'type': 'object', 'properties': properties}
+
+
+def _array_schema(array_items, serialize):
+    if array_items == 'object':
+        items = {'type': 'object',
+                 'properties': {'key': {'type': 'string'}, 'value': {'type': 'string'}}}
+    else:
+        items = {'type': 'string'}
+    schema = {'type': 'array', 'items': items}
+    if serialize:
+        schema['flatson_serialize'] = {'method': serialize}
+    return schema
+
+
+def generate_records(schema, count, missing_fraction=0.1, max_array_length=8, seed=0):
+    """Yield `count` objects following the schema, in which about
+    `missing_fraction` of the keys are missing
+    """
+    rnd = random.Random(seed)
+    for _ in range(count):
+        yield _value(rnd, schema, missing_fraction, max_array_length)
+
+
+def _value(rnd, schema, missing_fraction, max_array_length):
+    value_type = schema['type']
+    if value_type == 'object':
+        return dict((key, _value(rnd, subschema, missing_fraction, max_array_length))
+                    for key, subschema in sorted(schema['properties'].items())
+                    if rnd.random() >= missing_fraction)
+    if value_type == 'array':
+        return [_value(rnd, schema['items'], 0, max_array_length)
+                for _ in range(rnd.randint(0, max_array_length))]
+    if value_type == 'string':
+        return ' '.join(rnd.choice(WORDS) for _ in range(rnd.randint(1, 5)))
+    if value_type == 'number':
+        return round(rnd.uniform(-1000, 1000), 2)
+    if value_type == 'integer':
+        return rnd.randint(-1000000, 1000000)
+    return rnd.random() < 0.5
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""Measure the throughput and peak memory of flattening synthetic datasets
+
+Usage: python -m benchmarks.run [-o results.json] [options]
+"""
+from __future__ import unicode_literals, print_function, absolute_import
+
+import argparse
+import json
+import platform
+import sys
+import time
+
+try:
+    import tracemalloc
+except ImportError:  # Python 2
+    tracemalloc = None
+
+import flatson
+from flatson import Flatson
+
+from .datagen import generate_records, generate_schema
+
+timer = getattr(time, 'perf_counter', time.time)
+
+
+def _flatten(f, records):
+    flatten = f.flatten
+    for obj in records:
+        flatten(obj)
+
+
+def _flatten_dict(f, records):
+    flatten_dict = f.flatten_dict
+    for obj in records:
+        flatten_dict(obj)
+
+
+# serializers other than JSON expect the arrays to be present
+ARRAYS_ONLY = dict(depth=0, array_density=1.0, missing=0.0)
+
+# records repeating the same few array values, flattened with and without
+# memoization (`distinct` records cycled, `memoize` passed to Flatson)
+REPEATED = dict(ARRAYS_ONLY, distinct=100)
+MEMOIZED = dict(REPEATED, memoize=1024)
+
+# name -> (dataset options, whether to compile, function to run)
+CASES = {
+    'flatten': ({}, False, _flatten),
+    'flatten_compiled': ({}, True, _flatten),
+    'flatten_dict': ({}, False, _flatten_dict),
+    'serialize_json': (dict(ARRAYS_ONLY, array_items='object'), False, _flatten),
+    'serialize_extract_key_values': (
+        dict(ARRAYS_ONLY, array_items='object', serialize='extract_key_values'),
+        False, _flatten),
+    'serialize_extract_first': (dict(ARRAYS_ONLY, serialize='extract_first'), False, _flatten),
+    'serialize_join_values': (dict(ARRAYS_ONLY, serialize='join_values'), False, _flatten),
+    'repeated_json': (dict(REPEATED, array_items='object'), False, _flatten),
+    'memoized_json': (dict(MEMOIZED, array_items='object'), False, _flatten),
+    'repeated_extract_key_values': (
+        dict(REPEATED, array_items='object', serialize='extract_key_values'), False, _flatten),
+    'memoized_extract_key_values': (
+        dict(MEMOIZED, array_items='object', serialize='extract_key_values'), False, _flatten),
+    'repeated_join_values': (dict(REPEATED, serialize='join_values'), False, _flatten),
+    'memoized_join_values': (dict(MEMOIZED, serialize='join_values'), False, _flatten),
+}
+
+
+def measure_peak_memory(func, *args):
+    """Return the peak memory in bytes allocated while running func,
+    or None when tracemalloc is not available
+    """
+    if tracemalloc is None:
+        return None
+    tracemalloc.start()
+    try:
+        func(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_case(name, args):
+    case_options, compiled, func = CASES[name]
+    options = dict(width=args.width, depth=args.depth, array_density=args.array_density,
+                   missing=args.missing, seed=args.seed)
+    options.update(case_options)
+    missing = options.pop('missing')
+    distinct = options.pop('distinct', None)
+    memoize = options.pop('memoize', None)
+    schema = generate_schema(**options)
+    records = list(generate_records(schema, distinct or args.records,
+                                    missing_fraction=missing, seed=args.seed))
+    if distinct:  # copies, so that values are not the same objects
+        records = [json.loads(json.dumps(records[i % distinct]))
+                   for i in range(args.records)]
+    options.update(missing=missing, distinct=distinct, memoize=memoize)
+    f = Flatson(schema, json_backend=args.json_backend, memoize=memoize)
+    if compiled:
+        f.compile()
+
+    timings = []
+    for _ in range(args.repeat):
+        start = timer()
+        func(f, records)
+        timings.append(timer() - start)
+    best = min(timings)
+
+    return {
+        'name': name,
+        'dataset': options,
+        'fields': len(f.fields),
+        'records': len(records),
+        'seconds': best,
+        'records_per_sec': len(records) / best if best else None,
+        'peak_memory_bytes': measure_peak_memory(func, f, records),
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('-o', '--output', help='JSON file to write the results to')
+    parser.add_argument('--case', action='append', choices=sorted(CASES),
+                        help='benchmark to run, can be repeated (default: all)')
+    parser.add_argument('--records', type=int, default=10000)
+    parser.add_argument('--width', type=int, default=10,
+                        help='number of properties per object level')
+    parser.add_argument('--depth', type=int, default=2, help='levels of nested objects')
+    parser.add_argument('--array-density', type=float, default=0.2,
+                        help='fraction of properties that are arrays')
+    parser.add_argument('--missing', type=float, default=0.1,
+                        help='fraction of keys missing in the records')
+    parser.add_argument('--json-backend', default='json')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = []
+    for name in args.case or sorted(CASES):
+        result = run_case(name, args)
+        print('{name:<32} {records_per_sec:>12.0f} records/sec'.format(**result),
+              file=sys.stderr)
+        results.append(result)
+
+    report = {
+        'flatson_version': flatson.__version__,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'json_backend': args.json_backend,
+        'results': results,
+    }
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -6,3 +6,4 @@ __version__ = '0.1.0'
 
 
 from .flatson import Flatson  # NOQA
+from .router import FlatsonRouter  # NOQA
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""Flattening of objects from asynchronous iterables (Python 3.6+ only)
+
+This module is imported on demand by :meth:`flatson.Flatson.aflatten`,
+so that the rest of the package still works in Python 2.
+"""
+import asyncio
+
+_DONE = object()
+
+
+def _flatten_batch(flatten, batch):
+    return [flatten(obj) for obj in batch]
+
+
+async def _flatten_after(previous, flatten, batch, executor):
+    if previous is not None:
+        await asyncio.wait([previous])
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(executor, _flatten_batch, flatten, batch)
+
+
+async def _submit_batches(flatten, aiterable, batch_size, executor, queue):
+    previous = None
+
+    async def submit(batch):
+        nonlocal previous
+        # one batch in the executor at a time, as flattening updates the
+        # state of the instance (e.g., adaptive fields, statistics or memos)
+        previous = asyncio.ensure_future(_flatten_after(previous, flatten, batch, executor))
+        try:
+            # waits while the queue is full, stopping the consumption of the input
+            await queue.put(previous)
+        except asyncio.CancelledError:
+            previous.cancel()
+            raise
+
+    try:
+        batch = []
+        async for obj in aiterable:
+            batch.append(obj)
+            if len(batch) >= batch_size:
+                await submit(batch)
+                batch = []
+        if batch:
+            await submit(batch)
+    except Exception as e:
+        await queue.put(e)
+    else:
+        await queue.put(_DONE)
+
+
+async def aflatten(flatson, aiterable, batch_size=1000, max_pending=2, executor=None):
+    """Asynchronously yield the lists of field values of the objects from
+    `aiterable`, flattening batches of `batch_size` objects in `executor`
+    (the default executor of the event loop when None).
+
+    Batches are flattened one after the other, while the next ones are
+    read. At most `max_pending` batches are waiting to be consumed, and the
+    input isn't read any further until the rows of the oldest one are
+    yielded.
+    """
+    if batch_size < 1:
+        raise ValueError('Batch size should be a positive number, got %r' % batch_size)
+    queue = asyncio.Queue(maxsize=max_pending)
+    producer = asyncio.ensure_future(
+        _submit_batches(flatson.flatten, aiterable, batch_size, executor, queue))
+    try:
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                break
+            if isinstance(item, Exception):
+                raise item
+            for row in await item:
+                yield row
+    finally:
+        if not producer.done():
+            producer.cancel()
+        # don't leave batches running in the executor behind
+        while not queue.empty():
+            item = queue.get_nowait()
+            if isinstance(item, asyncio.Future):
+                item.cancel()
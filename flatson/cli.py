@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""Command line tool to flatten a stream of JSON Lines into CSV
+"""
+from __future__ import unicode_literals, print_function, absolute_import
+
+import argparse
+import csv
+import io
+import json
+import sys
+import time
+
+from .compression import open_input, open_output
+from .flatson import Flatson
+from .utils import iter_chunks
+
+PY2 = sys.version_info[0] == 2
+
+
+def iter_jsonlines(fileobjs):
+    """Yield the objects decoded from each non-blank line of binary files
+    """
+    for fileobj in fileobjs:
+        for line in fileobj:
+            line = line.strip()
+            if line:
+                yield json.loads(line.decode('utf-8'))
+
+
+def _open_inputs(paths, threaded=False):
+    if not paths or paths == ['-']:
+        yield getattr(sys.stdin, 'buffer', sys.stdin)
+        return
+    for path in paths:
+        if path == '-':
+            yield getattr(sys.stdin, 'buffer', sys.stdin)
+            continue
+        with open_input(path, threaded=threaded) as f:
+            yield f
+
+
+def _open_output(path, threaded=False):
+    if path == '-':
+        output = getattr(sys.stdout, 'buffer', sys.stdout)
+    else:
+        output = open_output(path, threaded=threaded)
+    if PY2:
+        return output
+    return io.TextIOWrapper(output, encoding='utf-8', newline='')
+
+
+def _encode_py2_row(row):
+    return [v.encode('utf-8') if isinstance(v, unicode) else v  # NOQA
+            for v in row]
+
+
+def write_csv(flatson, objects, output, header=True, batch_size=1000):
+    """Write the flattened objects as CSV rows to a file object,
+    one batch at a time. Return the number of objects written.
+    """
+    writer = csv.writer(output)
+    encode = _encode_py2_row if PY2 else None
+    if header:
+        fieldnames = flatson.fieldnames
+        writer.writerow(encode(fieldnames) if encode else fieldnames)
+    count = 0
+    for chunk in iter_chunks(objects, batch_size):
+        rows = flatson.flatten_many(chunk)
+        if encode:
+            rows = [encode(row) for row in rows]
+        writer.writerows(rows)
+        count += len(rows)
+    return count
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='flatson',
+        description='Flatten JSON Lines into CSV, as configured by a JSON schema')
+    parser.add_argument('schemafile', help='JSON schema file')
+    parser.add_argument('inputs', nargs='*', metavar='input',
+                        help='JSON Lines files to read, optionally compressed with '
+                             'gzip, bzip2 or xz (default: standard input)')
+    parser.add_argument('-o', '--output', default='-',
+                        help='CSV file to write, compressed if it ends with .gz, .bz2 '
+                             'or .xz (default: standard output)')
+    parser.add_argument('--no-header', dest='header', action='store_false',
+                        help="don't write the header row with the field names")
+    parser.add_argument('--batch-size', type=int, default=1000,
+                        help='number of rows written at once (default: %(default)s)')
+    parser.add_argument('--json-backend', default='auto',
+                        help='JSON encoder for arrays: json, orjson or auto (default: %(default)s)')
+    parser.add_argument('--coerce', choices=['null', 'raise'],
+                        help='convert values to the types in the schema, writing invalid '
+                             'ones as empty (null) or stopping with an error (raise)')
+    parser.add_argument('--memoize', type=int, metavar='N',
+                        help='remember the serialization of the last N distinct values '
+                             'of each array field')
+    parser.add_argument('--background-io', action='store_true',
+                        help='read, write and (de)compress files in background threads')
+    parser.add_argument('-q', '--quiet', action='store_true',
+                        help="don't report throughput on standard error")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    flatson = Flatson.from_schemafile(args.schemafile, json_backend=args.json_backend,
+                                      coerce=args.coerce, memoize=args.memoize).compile()
+
+    start = time.time()
+    output = _open_output(args.output, threaded=args.background_io)
+    try:
+        objects = iter_jsonlines(_open_inputs(args.inputs, threaded=args.background_io))
+        count = write_csv(flatson, objects, output,
+                          header=args.header, batch_size=args.batch_size)
+    finally:
+        if args.output == '-':
+            output.flush()
+            if not PY2:
+                output.detach()
+        else:
+            output.close()
+    elapsed = time.time() - start
+
+    if not args.quiet:
+        print('Flattened {count} records in {elapsed:.2f}s ({rate:.0f} records/sec)'.format(
+            count=count, elapsed=elapsed, rate=count / elapsed if elapsed else 0),
+            file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
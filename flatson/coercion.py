@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""Conversion of flattened values to the types declared in the schema
+"""
+from __future__ import unicode_literals, print_function, absolute_import
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+
+import re
+
+from .utils import integer_types, single_type, string_types
+
+try:
+    text_type = unicode  # NOQA
+except NameError:
+    text_type = str
+
+POLICIES = ('null', 'raise', 'collect')
+
+CoercionError = namedtuple('CoercionError', 'record field value error')
+
+
+def to_number(value):
+    if isinstance(value, float):
+        return value
+    if isinstance(value, bool):
+        raise TypeError('Boolean is not a number')
+    return float(value)
+
+
+def to_integer(value):
+    if isinstance(value, bool):
+        raise TypeError('Boolean is not an integer')
+    if isinstance(value, integer_types):
+        return value
+    if isinstance(value, float):
+        if not value.is_integer():
+            raise ValueError('Number is not an integer')
+        return int(value)
+    return int(value)
+
+
+_BOOLEANS = {'true': True, 'false': False, '1': True, '0': False}
+
+
+def to_boolean(value):
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, string_types):
+        return _BOOLEANS[value.strip().lower()]
+    if isinstance(value, integer_types) and value in (0, 1):
+        return bool(value)
+    raise TypeError('Not a boolean')
+
+
+def to_string(value):
+    if isinstance(value, string_types):
+        return value
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, integer_types + (float,)):
+        return text_type(value)
+    raise TypeError('Not a string')
+
+
+def to_date(value):
+    if isinstance(value, date):
+        return value
+    if not isinstance(value, string_types):
+        raise TypeError('Not a date string')
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+DATETIME = re.compile(r'([0-9]{4})-([0-9]{2})-([0-9]{2})[Tt ]([0-9]{2}):([0-9]{2}):([0-9]{2})'
+                      r'(?:\.([0-9]+))?([Zz]|[+-][0-9]{2}:[0-9]{2})?$')
+
+
+def to_datetime(value):
+    """Parse RFC 3339 date-times, returning naive datetimes in UTC (those
+    without offset are returned as they are). Fractions of seconds are
+    truncated to microseconds.
+    """
+    if isinstance(value, datetime):
+        return value
+    if not isinstance(value, string_types):
+        raise TypeError('Not a date-time string')
+    match = DATETIME.match(value)
+    if match is None:
+        raise ValueError('Invalid date-time')
+    fields = [int(g) for g in match.groups()[:6]]
+    microsecond = int(((match.group(7) or '') + '000000')[:6])
+    result = datetime(*fields, microsecond=microsecond)
+    offset = match.group(8)
+    if offset and offset not in 'Zz':
+        delta = timedelta(hours=int(offset[1:3]), minutes=int(offset[4:6]))
+        result = result - delta if offset[0] == '+' else result + delta
+    return result
+
+
+CONVERTERS = {
+    'number': to_number,
+    'integer': to_integer,
+    'boolean': to_boolean,
+    'string': to_string,
+}
+
+FORMAT_CONVERTERS = {
+    'date': to_date,
+    'date-time': to_datetime,
+}
+
+
+def converter_for(field):
+    """Return the function converting values of a field to the type in its
+    schema, or None when they are not to be converted (e.g., arrays, which
+    are serialized, or values of several types)
+    """
+    if field.is_array():
+        return None
+    schema = field.schema
+    field_type = single_type(schema.get('type'))
+    if field_type == 'string' and schema.get('format') in FORMAT_CONVERTERS:
+        return FORMAT_CONVERTERS[schema['format']]
+    return CONVERTERS.get(field_type)
+
+
+class Coercer(object):
+    """Convert the values of flattened rows to the types of their fields
+
+    Values that can't be converted are handled according to `on_error`:
+    'null' replaces them by None, 'raise' raises a ValueError and 'collect'
+    replaces them by None and keeps a :class:`CoercionError` in
+    :attr:`errors`, with the number of the record (counting all the rows
+    coerced so far), the field name, the value and the error message.
+    """
+    def __init__(self, fields, on_error='null'):
+        if on_error not in POLICIES:
+            raise ValueError('Unknown coercion policy: %s (expected one of: %s)'
+                             % (on_error, ', '.join(POLICIES)))
+        self.on_error = on_error
+        self.converters = [(position, field.name, converter)
+                           for position, field in enumerate(fields)
+                           for converter in [converter_for(field)]
+                           if converter is not None]
+        self._by_position = dict((position, (name, convert))
+                                 for position, name, convert in self.converters)
+        self.records = 0
+        self.errors = []
+
+    def _bad_value(self, record, name, value, error):
+        if self.on_error == 'raise':
+            raise ValueError('Invalid value for field {name}: {value!r} ({error})'.format(
+                name=name, value=value, error=error))
+        if self.on_error == 'collect':
+            self.errors.append(CoercionError(record, name, value, '%s' % error))
+        return None
+
+    def coerce_value(self, position, value, record=None):
+        """Convert the value of the field in `position` of the rows
+        """
+        converter = self._by_position.get(position)
+        if converter is None or value is None:
+            return value
+        name, convert = converter
+        try:
+            return convert(value)
+        except (TypeError, ValueError, KeyError, OverflowError) as e:
+            return self._bad_value(record, name, value, e)
+
+    def coerce_rows(self, rows):
+        """Convert in place the values of a list of rows, one field at a
+        time. Return the rows.
+        """
+        start = self.records
+        self.records += len(rows)
+        for position, name, convert in self.converters:
+            for i, row in enumerate(rows):
+                value = row[position]
+                if value is None:
+                    continue
+                try:
+                    row[position] = convert(value)
+                except (TypeError, ValueError, KeyError, OverflowError) as e:
+                    row[position] = self._bad_value(start + i, name, value, e)
+        return rows
+
+    def merge(self, records, errors):
+        """Count `records` coerced elsewhere (e.g., in a worker process)
+        after the ones coerced so far, keeping their `errors`, numbered from
+        the first of those records
+        """
+        self.errors.extend(e._replace(record=self.records + e.record) for e in errors)
+        self.records += records
+
+    def coerce_row(self, row):
+        """Convert in place the values of a row. Return the row.
+        """
+        return self.coerce_rows([row])[0]
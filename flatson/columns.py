@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""Column oriented storage for batches of flattened objects
+"""
+from __future__ import unicode_literals, print_function, absolute_import
+from array import array
+from collections import OrderedDict
+
+from .utils import single_type, string_types
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def _integer_typecode():
+    try:
+        array(str('q'))
+        return str('q')
+    except ValueError:  # Python 2 has no long long arrays
+        return str('l')
+
+
+TYPECODES = {
+    'number': str('d'),
+    'integer': _integer_typecode(),
+    'boolean': str('b'),
+}
+
+NUMPY_DTYPES = {
+    'number': 'float64',
+    'integer': 'int64',
+    'boolean': 'bool',
+}
+
+CODES_TYPECODE = str('i')
+CODES_NUMPY_DTYPE = 'int32'
+
+# columns are dictionary encoded automatically when they only have
+# strings, with at most this ratio of distinct values in the first batch
+# and no more than this number of them
+AUTO_DICTIONARY_RATIO = 0.25
+AUTO_DICTIONARY_MAX_SIZE = 256
+
+
+class ColumnBatch(OrderedDict):
+    """A batch of flattened objects, mapping each field name to its column
+
+    Columns of type number, integer and boolean are stored in typed arrays,
+    where missing values are zeroed and flagged in the null mask available
+    in :attr:`masks` (1 for null, 0 otherwise). Other columns are lists.
+
+    Dictionary encoded columns are typed arrays of integer codes, indexes
+    in the list of distinct values available in :attr:`dictionaries`, with
+    -1 (also flagged in the null mask) for missing values. That list is
+    shared by all the batches of a column, and grows with the new values
+    found in each batch.
+    """
+    def __init__(self, size=0, columns=(), masks=None, dictionaries=None):
+        super(ColumnBatch, self).__init__(columns)
+        self.size = size
+        self.masks = masks or {}
+        self.dictionaries = dictionaries or {}
+
+    def decode(self, name):
+        """Return the list of values of a column, decoding the dictionary
+        encoded ones
+        """
+        if name not in self.dictionaries:
+            return list(self[name])
+        dictionary = self.dictionaries[name]
+        return [dictionary[code] if code >= 0 else None for code in self[name]]
+
+
+class DictionaryEncoder(object):
+    """Map the values of a column to integer codes, in order of appearance.
+    Codes are kept between batches, so the dictionary only grows.
+    """
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def encode(self, values):
+        codes = self.codes
+        result = []
+        for value in values:
+            if value is None:
+                result.append(-1)
+                continue
+            code = codes.get(value)
+            if code is None:
+                code = codes[value] = len(self.values)
+                self.values.append(value)
+            result.append(code)
+        return result
+
+
+def is_low_cardinality(values, ratio=AUTO_DICTIONARY_RATIO, max_size=AUTO_DICTIONARY_MAX_SIZE):
+    """Tell whether a column only has strings (or missing values), with a
+    number of distinct values not above `ratio` of their number nor above
+    `max_size`
+    """
+    present = [v for v in values if v is not None]
+    if not present or not all(isinstance(v, string_types) for v in present):
+        return False
+    distinct = len(set(present))
+    return distinct <= max_size and distinct <= ratio * len(present)
+
+
+class ColumnBatchBuilder(object):
+    """Build :class:`ColumnBatch` objects out of flattened rows
+    """
+    def __init__(self, fieldnames, types, use_numpy=None, dictionary=None):
+        if use_numpy is None:
+            use_numpy = numpy is not None
+        elif use_numpy and numpy is None:
+            raise ValueError('NumPy is not available')
+        self.fieldnames = list(fieldnames)
+        types = [single_type(t) for t in types]  # e.g., ['number', 'null']
+        self.types = [t if t in TYPECODES else None for t in types]
+        self.use_numpy = use_numpy
+        self.auto_dictionary = dictionary == 'auto'
+        self.encoders = {}
+        if dictionary and not self.auto_dictionary:
+            for name in dictionary:
+                if name not in self.fieldnames:
+                    raise ValueError('Unknown field for dictionary encoding: %s' % name)
+                self.encoders[name] = DictionaryEncoder()
+
+    def _choose_dictionary_columns(self, values_by_column):
+        for name, col_type, values in zip(self.fieldnames, self.types, values_by_column):
+            if col_type is None and is_low_cardinality(values):
+                self.encoders[name] = DictionaryEncoder()
+        self.auto_dictionary = False
+
+    def _encoded_column(self, name, values):
+        encoder = self.encoders[name]
+        codes = encoder.encode(values)
+        mask = bytearray(code < 0 for code in codes)
+        if self.use_numpy:
+            return (numpy.array(codes, dtype=CODES_NUMPY_DTYPE),
+                    numpy.frombuffer(bytes(mask), dtype='bool'),
+                    encoder.values)
+        return array(CODES_TYPECODE, codes), mask, encoder.values
+
+    def _typed_column(self, name, col_type, values):
+        filled = [0 if v is None else v for v in values]
+        mask = bytearray(v is None for v in values)
+        try:
+            # built as an array first, which checks the types of the values
+            # (NumPy would convert e.g. '12' or 1.7 into an integer 12 or 1)
+            column = array(TYPECODES[col_type], filled)
+            if self.use_numpy:
+                return (numpy.array(column, dtype=NUMPY_DTYPES[col_type]),
+                        numpy.frombuffer(bytes(mask), dtype='bool'))
+            return column, mask
+        except (TypeError, ValueError, OverflowError):
+            raise ValueError('Invalid value for {type} column {name}'.format(
+                type=col_type, name=name))
+
+    def build(self, rows):
+        """Return a :class:`ColumnBatch` with the given flattened rows
+        """
+        batch = ColumnBatch(len(rows))
+        values_by_column = list(zip(*rows)) if rows else ()
+        if self.auto_dictionary and rows:
+            self._choose_dictionary_columns(values_by_column)
+        for name, col_type, values in zip(self.fieldnames, self.types, values_by_column):
+            if name in self.encoders:
+                (batch[name], batch.masks[name],
+                 batch.dictionaries[name]) = self._encoded_column(name, values)
+            elif col_type is None:
+                batch[name] = list(values)
+            else:
+                batch[name], batch.masks[name] = self._typed_column(name, col_type, values)
+        return batch
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""Generation of specialized flatten functions for a given field list
+"""
+from __future__ import unicode_literals, print_function, absolute_import
+
+
+def build_traversal(paths):
+    """Plan the lookups of `paths` so that each intermediate object is
+    fetched only once, however many paths share it as a prefix.
+
+    Return a pair of lists ``(objects, leaves)``: ``objects[i]`` is the
+    ``(parent, key)`` lookup of the intermediate object number ``i + 1``
+    (number 0 is the root object, and parents always come before their
+    children), and ``leaves[j]`` is the ``(parent, key)`` lookup of the
+    value of ``paths[j]``.
+    """
+    numbers = {(): 0}
+    objects = []
+    leaves = []
+    for path in paths:
+        parent = 0
+        for depth in range(1, len(path)):
+            prefix = tuple(path[:depth])
+            if prefix not in numbers:
+                objects.append((parent, path[depth - 1]))
+                numbers[prefix] = len(objects)
+            parent = numbers[prefix]
+        leaves.append((parent, path[-1]))
+    return objects, leaves
+
+
+def compile_flattener(paths, serializers, name='flatten'):
+    """Generate a function returning the list of values found in `paths`
+
+    `paths` is a list of key sequences and `serializers` a list of the same
+    size with the callable to apply to each value (or None to keep it as is).
+    Each intermediate object is looked up once into a local variable, shared
+    by all the paths below it.
+    """
+    objects, leaves = build_traversal(paths)
+
+    def var(number):
+        return '_{0}'.format(number) if number else 'obj'
+
+    lines = ['    {0} = {1}.get({2!r})\n'
+             '    if not isinstance({0}, dict):\n'
+             '        {0} = {{}}'.format(var(i), var(parent), key)
+             for i, (parent, key) in enumerate(objects, 1)]
+
+    namespace = {}
+    items = []
+    for i, ((parent, key), serialize) in enumerate(zip(leaves, serializers)):
+        expr = '{0}.get({1!r}, None)'.format(var(parent), key)
+        if serialize is not None:
+            serializer_name = '_serialize_{0}'.format(i)
+            namespace[serializer_name] = serialize
+            expr = '{0}({1})'.format(serializer_name, expr)
+        items.append(expr)
+
+    source = 'def {name}(obj):\n{lines}    return [\n{items}    ]\n'.format(
+        name=name, lines=''.join('%s\n' % line for line in lines),
+        items=''.join('        %s,\n' % it for it in items))
+    code = compile(source, '<flatson:{0}>'.format(name), 'exec')
+    exec(code, namespace)
+    return namespace[name]
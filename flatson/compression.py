@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+"""Reading and writing of files compressed with gzip, bzip2 or xz
+
+Compression is detected from the file extension or, when reading, from the
+magic bytes at the beginning of the file. Data is (de)compressed in large
+blocks, optionally in a background thread, so that the codec work overlaps
+with the flattening (zlib, bz2 and lzma release the GIL while working).
+"""
+from __future__ import unicode_literals, print_function, absolute_import
+
+import bz2
+import gzip
+import io
+import threading
+
+try:
+    import queue
+except ImportError:  # Python 2
+    import Queue as queue
+
+try:
+    import lzma
+except ImportError:  # Python 2
+    lzma = None
+
+BLOCK_SIZE = 1024 * 1024
+QUEUE_BLOCKS = 4
+
+EXTENSIONS = {
+    '.gz': 'gzip',
+    '.bz2': 'bz2',
+    '.xz': 'xz',
+}
+
+MAGIC_BYTES = [
+    (b'\x1f\x8b', 'gzip'),
+    (b'BZh', 'bz2'),
+    (b'\xfd7zXZ\x00', 'xz'),
+]
+
+
+def _open_compressed(path, compression, mode):
+    if compression == 'gzip':
+        return gzip.GzipFile(path, mode)
+    if compression == 'bz2':
+        return bz2.BZ2File(path, mode)
+    if compression == 'xz':
+        if lzma is None:
+            raise ValueError('xz compression requires the lzma module (Python 3.3+)')
+        return lzma.LZMAFile(path, mode)
+    raise ValueError('Unknown compression: {0}'.format(compression))
+
+
+def detect_compression(path, mode='rb'):
+    """Return the compression of the file at `path` ('gzip', 'bz2' or 'xz'),
+    or None if not compressed: from its extension, or when reading, from
+    its first bytes
+    """
+    for extension, compression in EXTENSIONS.items():
+        if path.endswith(extension):
+            return compression
+    if mode.startswith('r'):
+        with open(path, 'rb') as f:
+            head = f.read(6)
+        for magic, compression in MAGIC_BYTES:
+            if head.startswith(magic):
+                return compression
+    return None
+
+
+class _BlockReader(io.RawIOBase):
+    """Raw stream reading the blocks returned by `read_block` (empty at
+    the end of the stream)
+    """
+    def __init__(self, read_block, close=None):
+        self._read_block = read_block
+        self._close = close
+        self._block = b''
+        self._offset = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buf):
+        if self._offset >= len(self._block):
+            self._block, self._offset = self._read_block(), 0
+        size = min(len(buf), len(self._block) - self._offset)
+        buf[:size] = self._block[self._offset:self._offset + size]
+        self._offset += size
+        return size
+
+    def close(self):
+        if not self.closed and self._close is not None:
+            self._close()
+        super(_BlockReader, self).close()
+
+
+class _BlockWriter(io.RawIOBase):
+    """Raw stream passing each block written to `write_block`
+    """
+    def __init__(self, write_block, close=None):
+        self._write_block = write_block
+        self._close = close
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = memoryview(data).tobytes()
+        self._write_block(data)
+        return len(data)
+
+    def close(self):
+        if not self.closed and self._close is not None:
+            self._close()
+        super(_BlockWriter, self).close()
+
+
+class _ReaderThread(object):
+    """Background thread reading blocks of a file into a bounded queue
+    """
+    def __init__(self, fileobj, block_size=BLOCK_SIZE):
+        self.fileobj = fileobj
+        self.block_size = block_size
+        self.blocks = queue.Queue(QUEUE_BLOCKS)
+        self.stopped = False
+        self.thread = threading.Thread(target=self._run, name='flatson-reader')
+        self.thread.daemon = True
+        self.thread.start()
+
+    def _run(self):
+        try:
+            while not self.stopped:
+                block = self.fileobj.read(self.block_size)
+                self._put(block)
+                if not block:
+                    break
+        except Exception as e:
+            self._put(e)
+
+    def _put(self, item):
+        while not self.stopped:
+            try:
+                self.blocks.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def read_block(self):
+        block = self.blocks.get()
+        if isinstance(block, Exception) or not block:
+            self.blocks.put(block)  # so that later reads get the error or end too
+        if isinstance(block, Exception):
+            raise block
+        return block
+
+    def close(self):
+        self.stopped = True
+        self.thread.join()
+        self.fileobj.close()
+
+
+class _WriterThread(object):
+    """Background thread writing to a file the blocks from a bounded queue
+    """
+    def __init__(self, fileobj):
+        self.fileobj = fileobj
+        self.blocks = queue.Queue(QUEUE_BLOCKS)
+        self.error = None
+        self.thread = threading.Thread(target=self._run, name='flatson-writer')
+        self.thread.daemon = True
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            block = self.blocks.get()
+            if block is None:
+                return
+            if self.error is None:
+                try:
+                    self.fileobj.write(block)
+                except Exception as e:
+                    self.error = e
+
+    def _check_error(self):
+        if self.error is not None:
+            raise self.error
+
+    def write_block(self, block):
+        self._check_error()
+        self.blocks.put(block)
+
+    def close(self):
+        self.blocks.put(None)
+        self.thread.join()
+        try:
+            self._check_error()
+        finally:
+            self.fileobj.close()
+
+
+def open_input(path, threaded=False, block_size=BLOCK_SIZE):
+    """Open a file for reading binary data, decompressing it if needed
+    (see :func:`detect_compression`)
+
+    Data is read in blocks of `block_size` bytes and, when `threaded` is
+    True, by a background thread a few blocks ahead of the reader.
+    """
+    compression = detect_compression(path)
+    if compression is None:
+        fileobj = io.open(path, 'rb', buffering=block_size)
+    else:
+        fileobj = _open_compressed(path, compression, 'rb')
+
+    if threaded:
+        reader = _ReaderThread(fileobj, block_size)
+        raw = _BlockReader(reader.read_block, reader.close)
+    elif compression is None:
+        return fileobj
+    else:
+        raw = _BlockReader(lambda: fileobj.read(block_size), fileobj.close)
+    return io.BufferedReader(raw, block_size)
+
+
+def open_output(path, threaded=False, block_size=BLOCK_SIZE):
+    """Open a file for writing binary data, compressing it according to
+    its extension (see :data:`EXTENSIONS`)
+
+    Data is written in blocks of `block_size` bytes and, when `threaded`
+    is True, compressed and written by a background thread.
+    """
+    compression = detect_compression(path, 'wb')
+    if compression is None:
+        fileobj = io.open(path, 'wb', buffering=0)
+    else:
+        fileobj = _open_compressed(path, compression, 'wb')
+
+    if threaded:
+        writer = _WriterThread(fileobj)
+        raw = _BlockWriter(writer.write_block, writer.close)
+    else:
+        raw = _BlockWriter(fileobj.write, fileobj.close)
+    return io.BufferedWriter(raw, block_size)
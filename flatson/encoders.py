@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""JSON encoding backends for the default serialization of arrays
+
+All backends produce the same output of
+``json.dumps(value, separators=(',', ':'), sort_keys=True)``.
+"""
+from __future__ import unicode_literals, print_function, absolute_import
+
+import json
+import re
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+_stdlib_encoder = json.JSONEncoder(separators=(',', ':'), sort_keys=True)
+
+
+def dumps_stdlib(value):
+    """Serialize value to compact JSON with sorted keys, reusing the same
+    preconfigured encoder of the json module
+    """
+    return _stdlib_encoder.encode(value)
+
+
+JSON_BACKENDS = {
+    'json': dumps_stdlib,
+}
+
+
+if orjson is not None:
+    # types not supported by json are left for it to raise the error
+    _ORJSON_OPTIONS = (orjson.OPT_SORT_KEYS |
+                       getattr(orjson, 'OPT_PASSTHROUGH_DATACLASS', 0) |
+                       getattr(orjson, 'OPT_PASSTHROUGH_DATETIME', 0) |
+                       getattr(orjson, 'OPT_PASSTHROUGH_SUBCLASS', 0))
+
+    # floats in exponent notation, encoded by orjson without padding
+    # nor sign in the exponent
+    _EXPONENT = re.compile(br'e[-+0-9]')
+
+    def _may_differ(encoded):
+        """Tell whether orjson may have encoded differently from json:
+        non-ASCII and DEL characters (not escaped), NaN and infinity (as
+        null), floats in exponent notation or small floats (without exponent)
+        """
+        return (not encoded.isascii() or b'\x7f' in encoded or b'null' in encoded or
+                b'0.0000' in encoded or _EXPONENT.search(encoded) is not None)
+
+    def dumps_orjson(value):
+        """Serialize value like :func:`dumps_stdlib`, using orjson when it
+        is guaranteed to give the same output
+        """
+        if value is None:
+            return 'null'
+        try:
+            encoded = orjson.dumps(value, option=_ORJSON_OPTIONS)
+        except TypeError:  # e.g., big integers, non-string keys
+            return dumps_stdlib(value)
+        if _may_differ(encoded):
+            return dumps_stdlib(value)
+        return encoded.decode('ascii')
+
+    JSON_BACKENDS['orjson'] = dumps_orjson
+
+
+FASTEST_JSON_BACKEND = 'orjson' if 'orjson' in JSON_BACKENDS else 'json'
+
+
+def get_json_backend(name):
+    """Return the function of a JSON backend, by name. Use 'auto'
+    for the fastest backend available.
+    """
+    if name == 'auto':
+        name = FASTEST_JSON_BACKEND
+    try:
+        return JSON_BACKENDS[name]
+    except KeyError:
+        raise ValueError('Unknown or unavailable JSON backend: {0}'.format(name))
@@ -2,47 +2,62 @@
 from __future__ import unicode_literals, print_function, absolute_import
 from collections import namedtuple, OrderedDict
 
+import copy
+import fnmatch
+import functools
+import hashlib
 import json
 
+from .coercion import Coercer
+from .columns import ColumnBatchBuilder
+from .compiler import build_traversal, compile_flattener
+from .compression import open_input
+from .encoders import dumps_stdlib, get_json_backend
+from .inference import json_type
+from .jsonlines import DEFAULT_RANGE_SIZE, iter_lines, open_mmap, split_file
+from .memo import MemoizedSerializer
+from .parallel import pool_flatten, pool_flatten_ranges
+from .rows import LazyRow, Row, RowLayout
+from .scanner import build_path_trie, decode_paths
+from .stats import FieldStats, FlatsonStats, timer
+from .utils import LRUCache, iter_chunks, single_type, string_types
+
+
+_fields_cache = LRUCache(maxsize=128)
+
+
+class Field(namedtuple('Field', 'name path schema serialize')):
+    def getter(self, obj):
+        """Return the value found following the field path in obj, None
+        when missing or below a value that is not an object
+        """
+        path = self.path
+        for key in path[:-1]:
+            obj = obj.get(key)
+            if not isinstance(obj, dict):
+                obj = {}
+        return obj.get(path[-1], None)
 
-class Field(namedtuple('Field', 'name getter schema')):
     def is_array(self):
-        return self.schema.get('type') == 'array'
+        return self.serialize is not None
 
     def is_simple_list(self):
         if not self.is_array():
             return False
 
-        items_type = self.schema.get('items', {}).get('type')
+        items_type = single_type(self.schema.get('items', {}).get('type'))
         return items_type in ('number', 'string')
 
     @property
     def serialization_options(self):
         return self.schema.get('flatson_serialize') or {}
 
+    @property
+    def serialization_method(self):
+        return self.serialization_options.get('method')
 
-def create_getter(path, field_sep='.'):
-    if field_sep in path:
-        first_key, rest = path.split(field_sep, 1)
-        return lambda x: create_getter(rest)(x.get(first_key, {}))
-    else:
-        return lambda x: x.get(path, None)
-
-
-def infer_flattened_field_names(schema, field_sep='.'):
-    fields = []
-
-    for key, value in schema.get('properties', {}).items():
-        val_type = value.get('type')
-        if val_type == 'object':
-            for subfield in infer_flattened_field_names(value):
-                full_name = '{prefix}{fsep}{extension}'.format(
-                    prefix=key, fsep=field_sep, extension=subfield.name)
-                fields.append(Field(full_name, create_getter(full_name), subfield.schema))
-        else:
-            fields.append(Field(key, create_getter(key), value))
 
-    return sorted(fields)
+Field.__new__.__defaults__ = (None,)
 
 
 def extract_key_values(array_value, separators=(';', ',', ':'), **kwargs):
@@ -62,20 +77,199 @@ def join_values(array_value, separator=',', **kwargs):
     return separator.join(str(x) for x in array_value)
 
 
+DEFAULT_SERIALIZATION_METHODS = {
+    'extract_key_values': extract_key_values,
+    'extract_first': extract_first,
+    'join_values': join_values,
+}
+
+
+def parse_key_values(value, separators=(';', ',', ':'), **kwargs):
+    """Inverse of :func:`extract_key_values`, except for an array with a
+    single empty object, which is serialized as an empty array
+    """
+    items_sep, fields_sep, keys_sep = separators
+    if not value:
+        return []
+    return [dict(kv.split(keys_sep, 1) for kv in item.split(fields_sep)) if item else {}
+            for item in value.split(items_sep)]
+
+
+def wrap_first(value, **kwargs):
+    """Inverse of :func:`extract_first`, as far as possible: an array with
+    the first element only
+    """
+    return [value]
+
+
+def split_values(value, separator=',', **kwargs):
+    """Inverse of :func:`join_values`, giving back the elements as strings
+    """
+    return value.split(separator) if value else []
+
+
+def parse_json(value):
+    """Inverse of the default JSON serialization, with empty strings (e.g.,
+    from empty CSV cells) taken as missing values
+    """
+    return json.loads(value) if value != '' else None
+
+
+DEFAULT_INVERSE_METHODS = {
+    'extract_key_values': parse_key_values,
+    'extract_first': wrap_first,
+    'join_values': split_values,
+}
+
+
+class UnknownSerializationMethod(object):
+    """Placeholder serializer for a method not registered (yet)
+    """
+    def __init__(self, method):
+        self.method = method
+
+    def __call__(self, array_value):
+        raise ValueError('Unknown serialization method: {0}'.format(self.method))
+
+
+def bind_serializer(field, serialization_methods=DEFAULT_SERIALIZATION_METHODS,
+                    dumps_json=dumps_stdlib):
+    """Return the field with the serializer for its array values, as
+    configured in the schema via ``flatson_serialize`` (`dumps_json` when
+    no serialization method is configured)
+    """
+    if single_type(field.schema.get('type')) != 'array':
+        return field._replace(serialize=None)
+
+    options = dict(field.serialization_options)
+    if not options:
+        return field._replace(serialize=dumps_json)
+
+    try:
+        method = options.pop('method')
+    except KeyError:
+        raise ValueError(
+            'Missing method in serialization options for field %s' % field.name)
+
+    try:
+        serialize = serialization_methods[method]
+    except KeyError:
+        # may still be registered with Flatson.register_serialization_method
+        return field._replace(serialize=UnknownSerializationMethod(method))
+
+    if options:
+        serialize = functools.partial(serialize, **options)
+    return field._replace(serialize=serialize)
+
+
+class UnknownInverseMethod(object):
+    """Placeholder inverse for a serialization method that has none
+    """
+    def __init__(self, method):
+        self.method = method
+
+    def __call__(self, value):
+        raise ValueError('No inverse for serialization method: {0}'.format(self.method))
+
+
+def bind_inverse(field, inverse_methods=DEFAULT_INVERSE_METHODS):
+    """Return the function rebuilding the array values of a field from their
+    serialization, or None if the field is not an array
+    """
+    if not field.is_array():
+        return None
+    options = dict(field.serialization_options)
+    method = options.pop('method', None)
+    if method is None:
+        return parse_json
+    try:
+        inverse = inverse_methods[method]
+    except KeyError:
+        return UnknownInverseMethod(method)
+    if options:
+        inverse = functools.partial(inverse, **options)
+    return inverse
+
+
+def infer_flattened_field_names(schema, field_sep='.',
+                                serialization_methods=DEFAULT_SERIALIZATION_METHODS):
+    fields = []
+
+    for key, value in schema.get('properties', {}).items():
+        val_type = single_type(value.get('type'))
+        if val_type == 'object':
+            for subfield in infer_flattened_field_names(value, field_sep, serialization_methods):
+                full_name = '{prefix}{fsep}{extension}'.format(
+                    prefix=key, fsep=field_sep, extension=subfield.name)
+                fields.append(subfield._replace(name=full_name, path=(key,) + subfield.path))
+        else:
+            field = Field(key, (key,), value)
+            fields.append(bind_serializer(field, serialization_methods))
+
+    return sorted(fields, key=lambda f: f.name)
+
+
+def schema_cache_key(schema, field_sep='.'):
+    """Return a hash identifying the schema contents and field separator
+    """
+    canonical = json.dumps([schema, field_sep], sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()
+
+
+def clear_fields_cache():
+    """Forget the fields inferred from previously seen schemas
+    """
+    _fields_cache.clear()
+
+
 class Flatson(object):
     """This class implements flattening of JSON objects
+
+    Arrays without a configured serialization method are serialized as
+    JSON, with the encoder chosen by `json_backend`: 'json' (the standard
+    library), 'orjson' or 'auto' for the fastest available. All of them
+    produce the same output.
+
+    With `coerce`, the values are converted to the ``type`` (and for
+    strings, the date and date-time ``format``) of their fields, see
+    :class:`~.Coercer`. Values that can't be converted become None with
+    'null', raise a ValueError with 'raise', or become None and are
+    listed in ``coercer.errors`` with 'collect'.
+
+    With `memoize`, each array field remembers the serialization of its
+    last `memoize` distinct values (see :meth:`memoization_stats`), which
+    pays off when the same arrays (e.g., tags or categories) repeat a lot,
+    with serializations costlier than looking values up (e.g., JSON or
+    `extract_key_values`, not `join_values`).
+
+    With `adaptive`, keys not declared in the schema are detected while
+    flattening, and new fields are appended for them (in the order they
+    are found), widening :attr:`schema` (a copy of the one given) and
+    :attr:`fieldnames`. Rows flattened before some fields were added are
+    shorter, and can be padded with :meth:`backfill`.
     """
-    _default_serialization_methods = {
-        'extract_key_values': extract_key_values,
-        'extract_first': extract_first,
-        'join_values': join_values,
-    }
+    _default_serialization_methods = DEFAULT_SERIALIZATION_METHODS
 
-    def __init__(self, schema, field_sep='.'):
+    def __init__(self, schema, field_sep='.', json_backend='json', coerce=None,
+                 memoize=None, adaptive=False):
+        if adaptive:
+            schema = json.loads(json.dumps(schema))  # widened as new keys are found
         self.schema = schema
         self.field_sep = field_sep
-        self.fields = self._build_fields()
+        self.json_backend = json_backend
+        self.coerce = coerce
+        self.memoize = memoize
+        self.adaptive = adaptive
+        self._dumps_json = get_json_backend(json_backend)
         self._serialization_methods = dict(self._default_serialization_methods)
+        self._inverse_methods = dict(DEFAULT_INVERSE_METHODS)
+        self._compiled_flatten = None
+        self._flattener = None
+        self.stats = None
+        self._set_fields(self._build_fields())
+        if adaptive:
+            self._known_paths = build_path_trie(f.path for f in self.fields)
+        self._update_flattener()
 
     @property
     def fieldnames(self):
@@ -86,54 +280,625 @@ class Flatson(object):
     def _build_fields(self):
         if self.schema.get('type') != 'object':
             raise ValueError("Schema should be of type object")
-        return infer_flattened_field_names(self.schema,
-                                           field_sep=self.field_sep)
+
+        return self._memoize_serializers(self._use_json_backend(self._infer_fields()))
+
+    def _set_fields(self, fields):
+        self.fields = fields
+        self._path_trie = build_path_trie(f.path for f in fields)
+        self._objects, self._leaves = build_traversal([f.path for f in fields])
+        self._array_positions = [i for i, f in enumerate(fields) if f.is_array()]
+        self.row_layout = RowLayout(self.fieldnames)
+        self.coercer = Coercer(fields, self.coerce) if self.coerce else None
+        self._bind_inverses()
+
+    def _bind_inverses(self):
+        self._inverses = [(i, bind_inverse(f, self._inverse_methods))
+                          for i, f in enumerate(self.fields) if f.is_array()]
+
+    def _memoize_serializers(self, fields):
+        if not self.memoize:
+            return fields
+        return [f._replace(serialize=MemoizedSerializer(f.serialize, self.memoize))
+                if f.is_array() and not isinstance(f.serialize, (MemoizedSerializer,
+                                                                 UnknownSerializationMethod))
+                else f
+                for f in fields]
+
+    def _use_json_backend(self, fields):
+        if self._dumps_json is dumps_stdlib:
+            return list(fields)
+        return [f._replace(serialize=self._dumps_json) if f.serialize is dumps_stdlib else f
+                for f in fields]
+
+    def _infer_fields(self):
+        try:
+            key = schema_cache_key(self.schema, self.field_sep)
+        except (TypeError, ValueError):  # not JSON serializable, can't be cached
+            return infer_flattened_field_names(self.schema, field_sep=self.field_sep)
+
+        fields = _fields_cache.get(key)
+        if fields is None:
+            # infer from a private copy, so that changes in the original
+            # schema don't leak into the cached fields
+            schema = json.loads(json.dumps(self.schema))
+            fields = tuple(infer_flattened_field_names(schema, field_sep=self.field_sep))
+            _fields_cache.put(key, fields)
+        return fields
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state['_compiled_flatten'] = state['_flattener'] = None
+        state['_compile'] = self._compiled_flatten is not None
+        return state
+
+    def __setstate__(self, state):
+        compiled = state.pop('_compile', False)
+        self.__dict__.update(state)
+        if compiled:
+            self.compile()
+        self._update_flattener()
+
+    def _update_flattener(self):
+        if self.adaptive:
+            self._flattener = self._flatten_adaptive
+        elif self.coercer is not None:
+            self._flattener = self._flatten_coerced
+        elif self.stats is not None:
+            self._flattener = self._flatten_with_stats
+        else:
+            self._flattener = self._compiled_flatten
 
     @classmethod
-    def from_schemafile(cls, schemafile):
-        """Create a Flatson instance from a schemafile
+    def from_schemafile(cls, schemafile, **kwargs):
+        """Create a Flatson instance from a schemafile, which may be
+        compressed with gzip, bzip2 or xz
         """
-        with open(schemafile) as f:
-            return cls(json.load(f))
+        with open_input(schemafile) as f:
+            return cls(json.loads(f.read().decode('utf-8')), **kwargs)
 
-    def _serialize_array_value(self, field, value):
-        options = dict(field.serialization_options)
-
-        if options:
-            try:
-                method = options.pop('method')
-            except KeyError:
-                raise ValueError(
-                    'Missing method in serialization options for field %s' % field.name)
-
-            try:
-                serialize = self._serialization_methods[method]
-            except KeyError:
-                raise ValueError('Unknown serialization method: {method}'.format(**options))
-            return serialize(value, **options)
-
-        return json.dumps(value, separators=(',', ':'), sort_keys=True)
-
-    def _serialize(self, field, obj):
-        value = field.getter(obj)
-        if field.is_array():
-            return self._serialize_array_value(field, value)
-        return value
-
-    def register_serialization_method(self, name, serialize_func):
+    def register_serialization_method(self, name, serialize_func, inverse_func=None):
         """Register a custom serialization method that can be
         used via schema configuration
+
+        `inverse_func`, if given, rebuilds the array values from their
+        serialization in :meth:`unflatten`, receiving the same options.
         """
         if name in self._default_serialization_methods:
-            raise ValueError("Can't replace original %s serialization method")
+            raise ValueError("Can't replace original %s serialization method" % name)
         self._serialization_methods[name] = serialize_func
+        if inverse_func is not None:
+            self._inverse_methods[name] = inverse_func
+        else:
+            self._inverse_methods.pop(name, None)
+        self.fields = self._memoize_serializers([
+            bind_serializer(f, self._serialization_methods, self._dumps_json)
+            if f.is_array() and f.serialization_method == name else f
+            for f in self.fields])
+        self._bind_inverses()
+        if self._compiled_flatten is not None:
+            self.compile()
+
+    def compile(self):
+        """Generate a flatten function specialized for this schema, with
+        the field lookups and array serializers resolved in advance.
+
+        Once compiled, :meth:`flatten` and :meth:`flatten_dict` use the
+        generated function, producing the same output. Returns the
+        instance itself, so you can do ``Flatson(schema).compile()``.
+        """
+        for field in self.fields:
+            if isinstance(field.serialize, UnknownSerializationMethod):
+                raise ValueError('Unknown serialization method: {0}'.format(
+                    field.serialize.method))
+        self._compiled_flatten = compile_flattener([f.path for f in self.fields],
+                                                   [f.serialize for f in self.fields])
+        self._update_flattener()
+        return self
+
+    def enable_stats(self):
+        """Start collecting statistics about each field while flattening
+        (see :class:`~.FlatsonStats`), available in :attr:`stats`.
+
+        Flattening is slower while collecting statistics. Return the new
+        statistics object.
+        """
+        self.stats = FlatsonStats(self.fieldnames)
+        self._update_flattener()
+        return self.stats
+
+    def disable_stats(self):
+        """Stop collecting statistics. Return the statistics collected.
+        """
+        stats, self.stats = self.stats, None
+        self._update_flattener()
+        return stats
+
+    def memoization_stats(self):
+        """Return an OrderedDict mapping the names of the memoized array
+        fields to their number of memo hits, misses and size
+        """
+        return OrderedDict((f.name, f.serialize.as_dict()) for f in self.fields
+                           if isinstance(f.serialize, MemoizedSerializer))
+
+    def _flatten_with_stats(self, obj):
+        stats = self.stats
+        stats.records += 1
+        row = []
+        for field in self.fields:
+            field_stats = stats.fields[field.name]
+            start = timer()
+            value = field.getter(obj)
+            if value is None:
+                field_stats.missing += 1
+            if field.serialize is not None:
+                if isinstance(value, (list, tuple)):
+                    field_stats.add_array_length(len(value))
+                field_stats.serializer_calls += 1
+                value = field.serialize(value)
+            field_stats.time += timer() - start
+            row.append(value)
+        return row
+
+    def _flatten_uncoerced(self, obj):
+        if self.stats is not None:
+            return self._flatten_with_stats(obj)
+        if self._compiled_flatten is not None:
+            return self._compiled_flatten(obj)
+        return self._flatten_fields(obj)
+
+    def _flatten_adaptive(self, obj):
+        self._widen(obj)
+        if self.coercer is not None:
+            return self._flatten_coerced(obj)
+        return self._flatten_uncoerced(obj)
+
+    def _widen(self, obj):
+        new_paths = []
+        _find_new_paths(obj, self._known_paths, (), new_paths)
+        if new_paths:
+            self._add_fields(sorted(new_paths))
+
+    def _add_fields(self, new_paths):
+        fields = []
+        for path, value in new_paths:
+            try:
+                schema = {'type': json_type(value)}
+            except ValueError:  # not a JSON value
+                schema = {}
+            fields.append(bind_serializer(Field(self.field_sep.join(path), path, schema),
+                                          self._serialization_methods))
+            node = self.schema
+            for key in path[:-1]:
+                node = node.setdefault('properties', {}).setdefault(key, {'type': 'object'})
+            node.setdefault('properties', {})[path[-1]] = schema
+
+        coercer = self.coercer
+        self._set_fields(self.fields + self._memoize_serializers(self._use_json_backend(fields)))
+        if coercer is not None:
+            self.coercer.records, self.coercer.errors = coercer.records, coercer.errors
+        if self.stats is not None:
+            for field in fields:
+                self.stats.fields[field.name] = FieldStats(field.name)
+        if self._compiled_flatten is not None:
+            self.compile()
+
+    def backfill(self, rows):
+        """Yield the rows padded with None up to the current number of
+        fields, e.g., for the rows flattened in adaptive mode before the
+        last fields were added
+        """
+        width = len(self.fields)
+        for row in rows:
+            row = list(row)
+            if len(row) < width:
+                row.extend([None] * (width - len(row)))
+            yield row
+
+    def _flatten_coerced(self, obj):
+        return self.coercer.coerce_row(self._flatten_uncoerced(obj))
 
     def flatten(self, obj):
         """Return a list with the field values
         """
-        return [self._serialize(f, obj) for f in self.fields]
+        if self._flattener is not None:
+            return self._flattener(obj)
+        return self._flatten_fields(obj)
+
+    def _flatten_fields(self, obj):
+        objects = [obj]
+        for parent, key in self._objects:
+            value = objects[parent].get(key)
+            objects.append(value if isinstance(value, dict) else {})
+        values = [objects[parent].get(key, None) for parent, key in self._leaves]
+        fields = self.fields
+        for i in self._array_positions:
+            values[i] = fields[i].serialize(values[i])
+        return values
+
+    def unflatten(self, row):
+        """Return the object rebuilt from a row of field values: a list in
+        the order of :attr:`fieldnames` (as returned by :meth:`flatten`) or
+        a mapping from field names to values (e.g., from a CSV file).
+
+        Arrays are rebuilt with the inverse of their serialization method,
+        and missing (None) values and empty objects are left out. With
+        :attr:`coerce`, values are converted to the types of the schema
+        first, which is useful for rows read from text files.
+        """
+        return self.unflatten_many([row])[0]
+
+    def unflatten_many(self, rows):
+        """Return a list with the objects rebuilt from each row, see
+        :meth:`unflatten`
+        """
+        fieldnames = self.row_layout.fieldnames
+        rows = [[row.get(name) for name in fieldnames] if isinstance(row, dict) else list(row)
+                for row in rows]
+        if self.coercer is not None:
+            self.coercer.coerce_rows(rows)
+
+        objects = self._objects
+        leaves = self._leaves
+        inverses = self._inverses
+        result = []
+        for values in rows:
+            for i, inverse in inverses:
+                if values[i] is not None:
+                    values[i] = inverse(values[i])
+            nodes = [{}]
+            for parent, key in objects:
+                node = {}
+                nodes[parent][key] = node
+                nodes.append(node)
+            for (parent, key), value in zip(leaves, values):
+                if value is not None:
+                    nodes[parent][key] = value
+            # children come after their parents, prune them bottom-up
+            for number in range(len(objects), 0, -1):
+                if not nodes[number]:
+                    parent, key = objects[number - 1]
+                    del nodes[parent][key]
+            result.append(nodes[0])
+        return result
+
+    def flatten_many(self, objects):
+        """Return a list with the lists of field values of each object.
+        Values are coerced for all the objects at once, one field at a time.
+        """
+        if self.adaptive:
+            objects = list(objects)
+            for obj in objects:
+                self._widen(obj)
+        if self.coercer is None:
+            flatten = self._flatten_uncoerced if self.adaptive else self.flatten
+            return [flatten(obj) for obj in objects]
+        flatten = self._flatten_uncoerced
+        return self.coercer.coerce_rows([flatten(obj) for obj in objects])
 
     def flatten_dict(self, obj):
         """Return an OrderedDict dict preserving order of keys in fieldnames
         """
-        return OrderedDict(zip(self.fieldnames, self.flatten(obj)))
+        values = self.flatten(obj)  # in adaptive mode, it may add fields
+        return OrderedDict(zip(self.row_layout.fieldnames, values))
+
+    def flatten_row(self, obj):
+        """Return a compact :class:`~.Row` with the field values, which can
+        be accessed by position or by field name. All the rows of an
+        instance share the same :attr:`row_layout`.
+        """
+        values = tuple(self.flatten(obj))  # in adaptive mode, it may add fields
+        return Row(self.row_layout, values)
+
+    def flatten_lazy(self, obj):
+        """Return a :class:`~.LazyRow` over obj, getting and serializing
+        the value of each field only when it is first accessed, which is
+        cheaper than :meth:`flatten_row` for rows filtered or routed on a
+        few fields and then mostly dropped.
+
+        Values are coerced as they are computed when coercion is enabled.
+        Lazy rows are not counted by :meth:`enable_stats`.
+        """
+        if self.adaptive:
+            self._widen(obj)
+        coerce = None
+        if self.coercer is not None:
+            coerce = functools.partial(self.coercer.coerce_value, record=self.coercer.records)
+            self.coercer.records += 1
+        return LazyRow(self.row_layout, obj, self.fields, coerce)
+
+    def select(self, patterns):
+        """Return a new Flatson instance computing only the fields matching
+        `patterns`: exact field names or shell-style wildcards, such as
+        ``address.*``. A single pattern can also be given as a string.
+
+        Fields keep the order of :attr:`fieldnames`. Values of the other
+        fields are neither looked up nor serialized, and their keys are
+        skipped over by :meth:`flatten_bytes`.
+        """
+        if isinstance(patterns, string_types):
+            patterns = [patterns]
+        patterns = list(patterns)
+        fields = [f for f in self.fields
+                  if any(fnmatch.fnmatchcase(f.name, p) for p in patterns)]
+        for pattern in patterns:
+            if not any(fnmatch.fnmatchcase(f.name, pattern) for f in fields):
+                raise ValueError('No fields match: %s' % pattern)
+
+        selected = copy.copy(self)
+        selected._serialization_methods = dict(self._serialization_methods)
+        selected._inverse_methods = dict(self._inverse_methods)
+        selected._compiled_flatten = selected._flattener = selected.stats = None
+        selected.adaptive = False
+        selected._set_fields(fields)
+        selected._update_flattener()
+        if self._compiled_flatten is not None:
+            selected.compile()
+        return selected
+
+    def explode(self, *fieldnames):
+        """Return an :class:`ExplodedFlatson`, flattening objects into one
+        row per element of the given array fields (or per combination of
+        elements, when exploding more than one field)
+        """
+        return ExplodedFlatson(self, fieldnames)
+
+    def flatten_bytes(self, line):
+        """Return a list with the field values of the JSON object encoded in
+        `line` (UTF-8 bytes or text).
+
+        Only the values needed for the fields are decoded: the values of
+        other keys (e.g., big strings or objects not in the schema) are
+        skipped over instead of being decoded, so that they take no memory.
+        This trades speed for memory: the text is scanned in Python, which
+        is several times slower than ``flatten(json.loads(line))`` unless
+        most of it is in huge values not needed.
+        """
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        if self.adaptive:  # all keys are needed to find the new ones
+            return self.flatten(json.loads(line))
+        return self.flatten(decode_paths(line, self._path_trie))
+
+    def flatten_stream(self, fileobj):
+        """Flatten the JSON objects from each non-blank line in `fileobj`,
+        yielding the lists of field values (see :meth:`flatten_bytes`)
+        """
+        flatten_bytes = self.flatten_bytes
+        for line in fileobj:
+            if line.strip():
+                yield flatten_bytes(line)
+
+    def flatten_columns(self, iterable, batch_size=1000, use_numpy=None, dictionary=None):
+        """Flatten objects from `iterable`, yielding column oriented batches
+
+        Each batch is a :class:`~.ColumnBatch`, mapping field names to
+        columns of up to `batch_size` values. Number, integer and boolean
+        fields are stored in typed arrays (NumPy arrays if available, or
+        when `use_numpy` is True) with a null mask.
+
+        Columns named in `dictionary` are dictionary encoded: stored as
+        integer codes, with the distinct values in the batch
+        ``dictionaries``. Codes are the same in all the batches. With
+        ``dictionary='auto'``, the string columns with few distinct values
+        in the first batch are encoded.
+
+        Adaptive mode can't be used, as all the batches have the same columns.
+        """
+        if self.adaptive:
+            raise ValueError("Adaptive mode can't be used with column batches")
+        return self._iter_column_batches(iterable, batch_size, use_numpy, dictionary)
+
+    def _iter_column_batches(self, iterable, batch_size, use_numpy, dictionary):
+        builder = ColumnBatchBuilder(self.fieldnames,
+                                     [f.schema.get('type') for f in self.fields],
+                                     use_numpy=use_numpy, dictionary=dictionary)
+        for chunk in iter_chunks(iterable, batch_size):
+            yield builder.build(self.flatten_many(chunk))
+
+    def _check_not_adaptive(self):
+        if self.adaptive:
+            raise ValueError("Adaptive mode can't be used with worker processes")
+
+    def flatten_parallel(self, iterable, workers=None, chunksize=1000, ordered=True):
+        """Flatten objects from `iterable` in a pool of worker processes
+        (by default, one per CPU), yielding the lists of field values.
+
+        Objects are sent to the workers in chunks of `chunksize`, and the
+        results come in the input order unless `ordered` is False, in which
+        case each chunk is yielded as soon as it is ready. Statistics
+        collected by the workers are merged into :attr:`stats`, if enabled,
+        and coercion errors into those of :attr:`coercer`, numbered in the
+        order the rows are yielded.
+        """
+        self._check_not_adaptive()
+        return pool_flatten(self, iterable, workers=workers, chunksize=chunksize,
+                            ordered=ordered)
+
+    def _flatten_line(self, line):
+        # decoding whole lines with json is faster than the scanner of
+        # flatten_bytes(), unless most of each line is in skipped values
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        return self.flatten(json.loads(line))
+
+    def flatten_file(self, path, workers=None, range_size=DEFAULT_RANGE_SIZE):
+        """Flatten the JSON objects from each non-blank line of the file at
+        `path`, yielding the lists of field values
+
+        The file is memory-mapped and split into ranges of about
+        `range_size` bytes ending at newlines, flattened in a pool of
+        `workers` processes (by default, one per CPU) that read their ranges
+        themselves. Rows come in the same order of the lines in the file.
+        With one worker, the file is flattened in the current process.
+        """
+        if workers == 1:
+            return self._flatten_mmap_lines(path)
+        self._check_not_adaptive()
+        return pool_flatten_ranges(self, path, split_file(path, range_size),
+                                   workers=workers)
+
+    def _flatten_mmap_lines(self, path):
+        flatten_line = self._flatten_line
+        with open_mmap(path) as mm:
+            for line in iter_lines(mm):
+                yield flatten_line(line)
+
+    def aflatten(self, aiterable, batch_size=1000, max_pending=2, executor=None):
+        """Return an asynchronous generator of the lists of field values of
+        the objects from the asynchronous iterable `aiterable` (Python 3.6+).
+
+        Objects are flattened in batches of `batch_size` in `executor` (by
+        default, the event loop's), so that the loop isn't blocked. Reading
+        from `aiterable` is paused while `max_pending` batches are waiting
+        for their rows to be consumed.
+        """
+        from .aio import aflatten
+        return aflatten(self, aiterable, batch_size=batch_size,
+                        max_pending=max_pending, executor=executor)
+
+
+def _find_new_paths(obj, known, prefix, new_paths):
+    """Add to `new_paths` the (path, value) pairs of the leaves of `obj`
+    not found in the `known` trie, adding them to it. Null values and empty
+    objects are skipped, as their type isn't known yet.
+    """
+    for key, value in obj.items():
+        if key in known:
+            node = known[key]
+            if node is not None and isinstance(value, dict):
+                _find_new_paths(value, node, prefix + (key,), new_paths)
+        elif isinstance(value, dict):
+            if value:
+                known[key] = {}
+                _find_new_paths(value, known[key], prefix + (key,), new_paths)
+        elif value is not None:
+            known[key] = None
+            new_paths.append((prefix + (key,), value))
+
+
+class _ExplodedField(object):
+    """Columns for the elements of an exploded array field
+    """
+    def __init__(self, field, element_fields, start):
+        self.field = field
+        self.element_fields = element_fields
+        self.start = start
+        self.stop = start + max(len(element_fields), 1)
+        self.empty = [None] * (self.stop - start)
+
+    @property
+    def fieldnames(self):
+        return [f.name for f in self.element_fields] or [self.field.name]
+
+    def values(self, element):
+        if element is None:
+            return self.empty
+        if not self.element_fields:
+            return [element]
+        values = []
+        for f in self.element_fields:
+            try:
+                value = f.getter(element)
+            except AttributeError:  # not an object where expected
+                value = None
+            values.append(f.serialize(value) if f.serialize is not None else value)
+        return values
+
+
+class ExplodedFlatson(object):
+    """Flattening of objects into one row per element of some array fields
+
+    Each exploded field is replaced by the columns of its elements: the
+    flattened fields of the array items when they are objects, otherwise
+    a single column with the element itself. Rows are generated lazily,
+    and when exploding several fields, one per combination of their
+    elements. An empty or missing array gives a single row, with None in
+    the element columns, and a value other than an array is taken as its
+    only element. In arrays of objects, elements (or values in their paths)
+    that aren't objects give None in the columns of the fields below them.
+    """
+    def __init__(self, flatson, fieldnames):
+        fields_by_name = dict((f.name, f) for f in flatson.fields)
+        for name in fieldnames:
+            if name not in fields_by_name or not fields_by_name[name].is_array():
+                raise ValueError('Only array fields can be exploded, got: %s' % name)
+
+        self.flatson = flatson
+        self.base_fields = []  # (position in row, field) of not exploded fields
+        self.exploded = []
+        position = 0
+        for field in flatson.fields:
+            if field.name in fieldnames:
+                exploded = _ExplodedField(field, self._element_fields(field), position)
+                self.exploded.append(exploded)
+                position = exploded.stop
+            else:
+                self.base_fields.append((position, field))
+                position += 1
+        self._width = position
+
+    def _element_fields(self, field):
+        items_schema = field.schema.get('items') or {}
+        if single_type(items_schema.get('type')) != 'object':
+            return []
+        flatson = self.flatson
+        fields = infer_flattened_field_names(items_schema, flatson.field_sep,
+                                             flatson._serialization_methods)
+        return [f._replace(name='{prefix}{fsep}{name}'.format(
+                    prefix=field.name, fsep=flatson.field_sep, name=f.name))
+                for f in flatson._use_json_backend(fields)]
+
+    @property
+    def fieldnames(self):
+        """Field names, with the exploded fields replaced by their columns
+        """
+        names = [None] * self._width
+        for position, field in self.base_fields:
+            names[position] = field.name
+        for exploded in self.exploded:
+            names[exploded.start:exploded.stop] = exploded.fieldnames
+        return names
+
+    def flatten(self, obj):
+        """Yield a list with the field values for each row of the object
+        """
+        row = [None] * self._width
+        for position, field in self.base_fields:
+            value = field.getter(obj)
+            row[position] = field.serialize(value) if field.serialize is not None else value
+
+        arrays = []
+        for exploded in self.exploded:
+            elements = exploded.field.getter(obj)
+            if not isinstance(elements, (list, tuple)):
+                elements = [elements]
+            elif not elements:
+                elements = [None]
+            row[exploded.start:exploded.stop] = exploded.values(elements[0])
+            arrays.append(elements)
+
+        # go through the combinations of elements like an odometer
+        indexes = [0] * len(arrays)
+        while True:
+            yield list(row)
+            i = len(arrays) - 1
+            while i >= 0:
+                exploded, elements = self.exploded[i], arrays[i]
+                indexes[i] += 1
+                if indexes[i] < len(elements):
+                    row[exploded.start:exploded.stop] = exploded.values(elements[indexes[i]])
+                    break
+                indexes[i] = 0
+                row[exploded.start:exploded.stop] = exploded.values(elements[0])
+                i -= 1
+            if i < 0:
+                return
+
+    def flatten_dict(self, obj):
+        """Yield an OrderedDict for each row of the object, preserving the
+        order of keys in fieldnames
+        """
+        fieldnames = self.fieldnames
+        for row in self.flatten(obj):
+            yield OrderedDict(zip(fieldnames, row))
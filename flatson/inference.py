@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""Incremental inference of JSON schemas from streams of objects
+
+Objects are folded one at a time into a :class:`SchemaSummary`, whose size
+depends on the number of distinct keys seen, not on the number of objects.
+Summaries built separately (e.g., for each shard of a dataset, in different
+processes) can be merged, and turned into a schema that Flatson accepts::
+
+    >>> summary = SchemaSummary()
+    >>> summary.update(objects)
+    >>> summary.merge(other_summary)
+    >>> Flatson(summary.to_schema())
+"""
+from __future__ import unicode_literals, print_function, absolute_import
+
+from .utils import integer_types, string_types
+
+
+SCHEMA_URI = 'http://json-schema.org/draft-04/schema'
+
+
+def json_type(value):
+    """Return the JSON schema type name for a value
+    """
+    if value is None:
+        return 'null'
+    if isinstance(value, bool):
+        return 'boolean'
+    if isinstance(value, integer_types):
+        return 'integer'
+    if isinstance(value, float):
+        return 'number'
+    if isinstance(value, string_types):
+        return 'string'
+    if isinstance(value, dict):
+        return 'object'
+    if isinstance(value, (list, tuple)):
+        return 'array'
+    raise ValueError('Unsupported type for JSON value: %r' % type(value))
+
+
+class TypeSummary(object):
+    """Summary of the values found in one position of the objects: how many
+    values of each type, and recursively, the summary of the properties of
+    objects (and how many objects have each of them) and of array items.
+    """
+    def __init__(self):
+        self.types = {}
+        self.properties = {}
+        self.presence = {}
+        self.items = None
+
+    def add(self, value):
+        value_type = json_type(value)
+        self.types[value_type] = self.types.get(value_type, 0) + 1
+
+        if value_type == 'object':
+            for key, subvalue in value.items():
+                self.presence[key] = self.presence.get(key, 0) + 1
+                if key not in self.properties:
+                    self.properties[key] = TypeSummary()
+                self.properties[key].add(subvalue)
+        elif value_type == 'array':
+            if self.items is None:
+                self.items = TypeSummary()
+            for item in value:
+                self.items.add(item)
+
+    def merge(self, other):
+        for value_type, count in other.types.items():
+            self.types[value_type] = self.types.get(value_type, 0) + count
+        for key, count in other.presence.items():
+            self.presence[key] = self.presence.get(key, 0) + count
+        for key, summary in other.properties.items():
+            if key not in self.properties:
+                self.properties[key] = TypeSummary()
+            self.properties[key].merge(summary)
+        if other.items is not None:
+            if self.items is None:
+                self.items = TypeSummary()
+            self.items.merge(other.items)
+
+    def _schema_for(self, value_type):
+        if value_type == 'object':
+            count = self.types['object']
+            schema = {
+                'type': 'object',
+                'properties': dict((key, summary.to_schema())
+                                   for key, summary in self.properties.items()),
+            }
+            required = sorted(k for k, seen in self.presence.items() if seen == count)
+            if required:
+                schema['required'] = required
+            return schema
+        if value_type == 'array' and self.items is not None and self.items.types:
+            return {'type': 'array', 'items': self.items.to_schema()}
+        return {'type': value_type}
+
+    def to_schema(self):
+        """Return the JSON schema describing all the values seen
+
+        Values of several types besides null give a schema with a list of
+        types, when one of them is 'object' or 'array' (e.g., ``{'type':
+        ['array', 'string'], 'items': ...}``), so that Flatson flattens the
+        objects or serializes the values as arrays, or else an ``anyOf``.
+        """
+        types = set(self.types)
+        if 'integer' in types and 'number' in types:
+            types.remove('integer')
+        if 'object' in types and not self.properties and len(types - set(['null'])) > 1:
+            types.remove('object')  # empty objects have nothing to flatten
+        nullable = 'null' in types and len(types) > 1
+        if nullable:  # e.g., {'type': ['object', 'null'], ...}
+            types.remove('null')
+        if not types:
+            return {}
+        structured = [t for t in ('array', 'object') if t in types]
+        if len(types) == 1 or len(structured) == 1:
+            main = structured[0] if structured else types.pop()
+            schema = self._schema_for(main)
+            others = sorted(types - set([main])) + (['null'] if nullable else [])
+            if others:
+                schema['type'] = [main] + others
+            return schema
+        if nullable:
+            types.add('null')
+        return {'anyOf': [self._schema_for(t) for t in sorted(types)]}
+
+
+class SchemaSummary(object):
+    """Mergeable summary of a stream of objects, from which a JSON schema
+    can be generated at any time
+    """
+    def __init__(self):
+        self.count = 0
+        self.root = TypeSummary()
+
+    def add(self, obj):
+        """Fold an object into the summary
+        """
+        if not isinstance(obj, dict):
+            raise ValueError('Expected an object, got %r' % type(obj))
+        self.count += 1
+        self.root.add(obj)
+
+    def update(self, objects):
+        """Fold all objects from an iterable into the summary
+        """
+        for obj in objects:
+            self.add(obj)
+        return self
+
+    def merge(self, other):
+        """Fold another summary into this one. Return this summary.
+        """
+        self.count += other.count
+        self.root.merge(other.root)
+        return self
+
+    def to_schema(self):
+        """Return a JSON schema for the objects seen so far
+        """
+        schema = self.root.to_schema() or {'type': 'object', 'properties': {}}
+        schema['$schema'] = SCHEMA_URI
+        return schema
+
+
+def infer_schema(objects):
+    """Return a JSON schema for the objects from an iterable
+    """
+    return SchemaSummary().update(objects).to_schema()
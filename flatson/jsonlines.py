@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""Reading of JSON Lines files through memory maps
+
+Files are split into byte ranges ending at newlines, which can be read
+independently (e.g., each one by a different process) without anybody
+having to read the whole file to find where the lines start.
+"""
+from __future__ import unicode_literals, print_function, absolute_import
+from contextlib import contextmanager
+
+import mmap
+import os
+
+DEFAULT_RANGE_SIZE = 64 * 1024 * 1024
+
+
+@contextmanager
+def open_mmap(path):
+    """Context manager giving a read-only memory map of the file at `path`,
+    or an empty bytes string for empty files (which can't be mapped)
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b''
+            return
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield mm
+        finally:
+            mm.close()
+
+
+def split_ranges(data, size=DEFAULT_RANGE_SIZE):
+    """Return a list of ``(start, end)`` byte ranges covering `data` (a
+    memory map or bytes), of about `size` bytes each: every range but the
+    last one is extended up to the end of the line it would cut.
+    """
+    if size < 1:
+        raise ValueError('Range size should be a positive number, got %r' % size)
+    ranges = []
+    start, length = 0, len(data)
+    while start < length:
+        end = data.find(b'\n', min(start + size, length) - 1)
+        end = length if end == -1 else end + 1
+        ranges.append((start, end))
+        start = end
+    return ranges
+
+
+def split_file(path, size=DEFAULT_RANGE_SIZE):
+    """Return the byte ranges of the JSON Lines file at `path`, see
+    :func:`split_ranges`
+    """
+    with open_mmap(path) as mm:
+        return split_ranges(mm, size)
+
+
+def iter_lines(data, start=0, end=None):
+    """Yield the non-blank lines in the range from `start` to `end` of
+    `data` (a memory map or bytes), without the trailing newline
+    """
+    if end is None:
+        end = len(data)
+    find = data.find
+    while start < end:
+        stop = find(b'\n', start, end)
+        if stop == -1:
+            stop = end
+        line = data[start:stop]
+        if line.strip():
+            yield line
+        start = stop + 1
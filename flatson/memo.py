@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""Memoization of the serialization of array values
+"""
+from __future__ import unicode_literals, print_function, absolute_import
+from collections import OrderedDict
+from itertools import chain
+
+from .utils import move_to_end
+
+_MISSING = object()
+
+
+def memo_key(value):
+    """Return a hashable key identifying an array value
+
+    Lists of strings are identified by their items, and lists of objects
+    with string values by the items of the objects, in order. Lists of other
+    scalars also by the types of the items, which tells apart values equal
+    in Python that serialize differently (e.g., ``1`` and ``True``). Other
+    values (e.g., with nested arrays, or floats, as ``0.0`` and ``-0.0`` are
+    equal) are identified by their repr.
+    """
+    if type(value) is list:
+        try:
+            # joining fails unless all the values joined are strings
+            if value and type(value[0]) is dict:
+                ''.join(chain.from_iterable(map(dict.values, value)))
+                return tuple(map(tuple, map(dict.items, value)))
+            ''.join(value)
+            return tuple(value)
+        except (TypeError, ValueError):
+            pass
+        types = tuple(map(type, value))
+        if not (dict in types or list in types or float in types):
+            return tuple(value), types
+    return repr(value)
+
+
+class MemoizedSerializer(object):
+    """Serializer remembering the results for the last `maxsize` distinct
+    array values (see :func:`memo_key`), counting the :attr:`hits` and
+    :attr:`misses`
+    """
+    def __init__(self, serialize, maxsize=1024):
+        self.serialize = serialize
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+
+    def __call__(self, value):
+        key = memo_key(value)
+        cache = self._cache
+        result = cache.get(key, _MISSING)
+        if result is _MISSING:
+            self.misses += 1
+            result = cache[key] = self.serialize(value)
+            if len(cache) > self.maxsize:
+                cache.popitem(last=False)
+        else:
+            self.hits += 1
+            move_to_end(cache, key)
+        return result
+
+    def __len__(self):
+        return len(self._cache)
+
+    def __reduce__(self):
+        # copies (e.g., sent to worker processes) start with an empty memo
+        return (MemoizedSerializer, (self.serialize, self.maxsize))
+
+    def clear(self):
+        self._cache.clear()
+        self.hits = self.misses = 0
+
+    def as_dict(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._cache)}
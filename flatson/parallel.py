@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""Flattening of objects in a pool of worker processes
+"""
+from __future__ import unicode_literals, print_function, absolute_import
+from collections import deque
+
+import multiprocessing
+
+from .jsonlines import iter_lines, open_mmap
+from .utils import iter_chunks
+
+
+_worker_flatson = None
+
+
+def _init_worker(flatson):
+    global _worker_flatson
+    _worker_flatson = flatson
+    if flatson.stats is not None:
+        flatson.enable_stats()
+    if flatson.coercer is not None:
+        flatson.coercer.records, flatson.coercer.errors = 0, []
+
+
+def _flatten_chunk(chunk):
+    return _with_results(_worker_flatson.flatten_many(chunk))
+
+
+def _flatten_range(task):
+    path, start, end = task
+    flatten_line = _worker_flatson._flatten_line
+    with open_mmap(path) as mm:
+        rows = [flatten_line(line) for line in iter_lines(mm, start, end)]
+    return _with_results(rows)
+
+
+def _with_results(rows):
+    """Return the rows of a task with the statistics and coercion errors
+    collected for them, starting afresh for the next task
+    """
+    flatson = _worker_flatson
+    stats = flatson.stats
+    if stats is not None:
+        flatson.enable_stats()
+    errors = []
+    coercer = flatson.coercer
+    if coercer is not None:
+        errors, coercer.errors, coercer.records = coercer.errors, [], 0
+    return rows, stats, errors
+
+
+def _pop_rows(flatson, pending, ordered):
+    rows, stats, errors = _pop_result(pending, ordered)
+    if stats is not None and flatson.stats is not None:
+        flatson.stats.merge(stats)
+    if flatson.coercer is not None:
+        flatson.coercer.merge(len(rows), errors)
+    return rows
+
+
+def _pop_result(pending, ordered):
+    if ordered:
+        return pending.popleft().get()
+
+    while True:
+        for result in pending:
+            if result.ready():
+                pending.remove(result)
+                return result.get()
+        pending[0].wait(0.01)
+
+
+def pool_flatten(flatson, iterable, workers=None, chunksize=1000, ordered=True):
+    """Flatten objects from `iterable` in a pool of `workers` processes,
+    sending them in chunks of `chunksize` objects.
+
+    Only a couple of chunks per worker are in flight at any time, so the
+    input is consumed as the results are generated.
+    """
+    return _pool_rows(flatson, _flatten_chunk, iter_chunks(iterable, chunksize),
+                      workers, ordered)
+
+
+def pool_flatten_ranges(flatson, path, ranges, workers=None):
+    """Flatten the JSON lines in each of the byte `ranges` of the file at
+    `path` in a pool of `workers` processes, yielding the rows in the order
+    of the ranges. Workers read the lines from the file themselves, only
+    the ranges and the resulting rows go through the pool.
+    """
+    tasks = ((path, start, end) for start, end in ranges)
+    return _pool_rows(flatson, _flatten_range, tasks, workers, True)
+
+
+def _pool_rows(flatson, func, tasks, workers, ordered):
+    workers = workers or multiprocessing.cpu_count()
+    max_pending = 2 * workers
+    pending = deque()
+    pool = multiprocessing.Pool(workers, initializer=_init_worker, initargs=(flatson,))
+    try:
+        for task in tasks:
+            pending.append(pool.apply_async(func, (task,)))
+            if len(pending) >= max_pending:
+                for row in _pop_rows(flatson, pending, ordered):
+                    yield row
+        while pending:
+            for row in _pop_rows(flatson, pending, ordered):
+                yield row
+    except BaseException:
+        pool.terminate()
+        raise
+    else:
+        pool.close()
+    finally:
+        pool.join()
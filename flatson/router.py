@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""Flattening of streams mixing records of several types, each one with
+its own schema
+"""
+from __future__ import unicode_literals, print_function, absolute_import
+
+from .flatson import Field, Flatson
+from .utils import LRUCache, string_types
+
+
+class FlatsonRouter(object):
+    """Flatten each record with the schema of its type
+
+    The type of a record is given by `discriminator`, either a callable
+    taking the record or the path of a field (e.g., ``'meta.type'``, split
+    by `field_sep`), and `schemas` maps each type to its schema. A
+    :class:`~.Flatson` instance is created for a type when the first record
+    of that type is seen, keeping at most `maxsize` of them; other keyword
+    arguments are passed to :class:`~.Flatson`.
+
+    Records of types not in `schemas` raise a ValueError, unless
+    `skip_unknown` is True, in which case they are ignored.
+    """
+    def __init__(self, discriminator, schemas, field_sep='.', maxsize=16,
+                 skip_unknown=False, **flatson_kwargs):
+        if isinstance(discriminator, string_types):
+            discriminator = discriminator.split(field_sep)
+        if not callable(discriminator):
+            discriminator = Field(field_sep.join(discriminator), tuple(discriminator), {}).getter
+        self.discriminator = discriminator
+        self.schemas = schemas
+        self.field_sep = field_sep
+        self.skip_unknown = skip_unknown
+        self.flatson_kwargs = flatson_kwargs
+        self._flatsons = LRUCache(maxsize)
+
+    def flatson_for(self, record_type):
+        """Return the :class:`~.Flatson` instance for a record type
+        """
+        flatson = self._flatsons.get(record_type)
+        if flatson is None:
+            try:
+                schema = self.schemas[record_type]
+            except KeyError:
+                raise ValueError('No schema for record type: %r' % (record_type,))
+            flatson = Flatson(schema, field_sep=self.field_sep, **self.flatson_kwargs)
+            self._flatsons.put(record_type, flatson)
+        return flatson
+
+    def fieldnames(self, record_type):
+        """Field names of the records of a type
+        """
+        return self.flatson_for(record_type).fieldnames
+
+    def flatten(self, obj):
+        """Return a pair with the type of the record and its list of field
+        values, or None if the type is unknown and skipped
+        """
+        record_type = self.discriminator(obj)
+        if self.skip_unknown and record_type not in self.schemas:
+            return None
+        return record_type, self.flatson_for(record_type).flatten(obj)
+
+    def route(self, iterable):
+        """Flatten records from `iterable`, yielding pairs with their types
+        and lists of field values
+        """
+        flatten = self.flatten
+        for obj in iterable:
+            routed = flatten(obj)
+            if routed is not None:
+                yield routed
+
+    def dispatch(self, iterable, sinks):
+        """Flatten records from `iterable`, sending the lists of field
+        values of each type to its sink, in one pass. Return a dict with
+        the number of records of each type.
+
+        `sinks` is either a mapping from types to callables taking a list
+        of field values (e.g., the ``writerow`` method of CSV writers), or a
+        callable taking a type and its Flatson instance and returning the
+        sink for that type, called for the first record of each type.
+        """
+        counts = {}
+        opened = {}
+        for record_type, row in self.route(iterable):
+            sink = opened.get(record_type)
+            if sink is None:
+                if callable(sinks):
+                    sink = sinks(record_type, self.flatson_for(record_type))
+                else:
+                    sink = sinks[record_type]
+                opened[record_type] = sink
+            sink(row)
+            counts[record_type] = counts.get(record_type, 0) + 1
+        return counts
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""Compact rows of flattened values, accessible by position or field name
+"""
+from __future__ import unicode_literals, print_function, absolute_import
+from collections import OrderedDict
+
+
+class RowLayout(object):
+    """Field names and their positions, shared by all the rows of a schema
+    """
+    def __init__(self, fieldnames):
+        self.fieldnames = tuple(fieldnames)
+        self.index = dict((name, i) for i, name in enumerate(self.fieldnames))
+
+    def __len__(self):
+        return len(self.fieldnames)
+
+    def __eq__(self, other):
+        return isinstance(other, RowLayout) and self.fieldnames == other.fieldnames
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.fieldnames)
+
+
+class Row(object):
+    """A tuple of field values sharing a :class:`RowLayout`
+
+    Rows behave like sequences of values (indexing by position, iteration,
+    len), and can also be indexed by field name, like a read-only mapping.
+    """
+    __slots__ = ('layout', 'values')
+
+    def __init__(self, layout, values):
+        self.layout = layout
+        self.values = values
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, slice)):
+            return self.values[key]
+        return self.values[self.layout.index[key]]
+
+    def __len__(self):
+        return len(self.values)
+
+    def __iter__(self):
+        return iter(self.values)
+
+    def __contains__(self, value):
+        return value in self.values
+
+    def __eq__(self, other):
+        if isinstance(other, Row):
+            return self.values == other.values and self.layout == other.layout
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    __hash__ = None
+
+    def __repr__(self):
+        return 'Row(%s)' % ', '.join('%s=%r' % item for item in self.items())
+
+    def __reduce__(self):
+        return (Row, (self.layout, self.values))
+
+    def get(self, fieldname, default=None):
+        """Return the value of a field, or default if there is no such field
+        """
+        try:
+            return self.values[self.layout.index[fieldname]]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return list(self.layout.fieldnames)
+
+    def items(self):
+        return list(zip(self.layout.fieldnames, self.values))
+
+    def as_dict(self):
+        """Return a dict mapping field names to values
+        """
+        return dict(zip(self.layout.fieldnames, self.values))
+
+    def as_ordered_dict(self):
+        """Return an OrderedDict preserving the order of the field names
+        """
+        return OrderedDict(zip(self.layout.fieldnames, self.values))
+
+
+_UNSET = object()
+
+
+class LazyRow(Row):
+    """A :class:`Row` over a source object, computing the value of each
+    field (getting and serializing it) only when first accessed
+
+    Accessing all the values (iterating, :attr:`values`, :meth:`items`,
+    comparing...) computes the remaining ones. Pickled lazy rows become
+    plain :class:`Row` objects.
+    """
+    __slots__ = ('obj', 'fields', 'coerce', '_cache')
+
+    def __init__(self, layout, obj, fields, coerce=None):
+        self.layout = layout
+        self.obj = obj
+        self.fields = fields
+        self.coerce = coerce
+        self._cache = [_UNSET] * len(fields)
+
+    def _value(self, position):
+        value = self._cache[position]
+        if value is _UNSET:
+            field = self.fields[position]
+            value = field.getter(self.obj)
+            if field.serialize is not None:
+                value = field.serialize(value)
+            if self.coerce is not None:
+                value = self.coerce(position, value)
+            self._cache[position] = value
+        return value
+
+    @property
+    def values(self):
+        return tuple(self._value(i) for i in range(len(self._cache)))
+
+    def computed(self):
+        """Return the number of values computed so far
+        """
+        return sum(1 for value in self._cache if value is not _UNSET)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return tuple(self._value(i) for i in range(*key.indices(len(self._cache))))
+        if isinstance(key, int):
+            if key < 0:
+                key += len(self._cache)
+            if not 0 <= key < len(self._cache):
+                raise IndexError('Row index out of range')
+            return self._value(key)
+        return self._value(self.layout.index[key])
+
+    def __len__(self):
+        return len(self._cache)
+
+    def __iter__(self):
+        for i in range(len(self._cache)):
+            yield self._value(i)
+
+    def __contains__(self, value):
+        return any(v == value for v in self)
+
+    def get(self, fieldname, default=None):
+        try:
+            position = self.layout.index[fieldname]
+        except KeyError:
+            return default
+        return self._value(position)
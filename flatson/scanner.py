@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""Decoding of selected values from JSON text, skipping over everything else
+"""
+from __future__ import unicode_literals, print_function, absolute_import
+from json.decoder import scanstring
+
+import json
+import re
+
+
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+KEY = re.compile(r'"([^"\\]*)"[ \t\n\r]*:[ \t\n\r]*')
+DELIMITER = re.compile(r'[ \t\n\r]*([,}])[ \t\n\r]*')
+SCALAR = re.compile(r'[^\s,\]}]+')
+# the regex engine keeps state for each repetition of a group, so they are
+# limited to keep the memory used bounded, matching long values in pieces
+# characters of a string, up to a number of escapes
+STRING_PIECE = re.compile(r'[^"\\]*(?:\\.[^"\\]*){0,1000}', re.DOTALL)
+# everything up to the next bracket out of a string, or up to a string
+# with too many escapes or after too many strings
+NO_BRACKETS = re.compile(r'[^"\[\]{}]*(?:"[^"\\]*(?:\\.[^"\\]*){0,1000}"[^"\[\]{}]*){0,1000}',
+                         re.DOTALL)
+
+_decoder = json.JSONDecoder()
+
+
+def build_path_trie(paths):
+    """Return nested dicts with the keys of each path, where the last key
+    of each path maps to None. A path below the end of another one is
+    left out, as the whole value at that end is needed anyway.
+    """
+    trie = {}
+    for path in paths:
+        node = trie
+        for key in path[:-1]:
+            node = node.setdefault(key, {})
+            if node is None:
+                break
+        else:
+            node[path[-1]] = None
+    return trie
+
+
+def _skip_string(s, idx):
+    end = s.find('"', idx + 1)
+    if end == -1:
+        raise ValueError('Unterminated string starting at char %d' % idx)
+    if s.find('\\', idx + 1, end) == -1:
+        return end + 1
+    # escaped characters: find the end without decoding the string, looking
+    # for quotes not escaped, or matching in pieces when there are many
+    for _ in range(8):
+        start = end
+        while s[start - 1] == '\\':
+            start -= 1
+        if (end - start) % 2 == 0:
+            return end + 1
+        idx = end + 1
+        end = s.find('"', idx)
+        if end == -1:
+            raise ValueError('Unterminated string')
+    while True:
+        end = STRING_PIECE.match(s, idx).end()
+        if s[end:end + 1] == '"':
+            return end + 1
+        if end == idx:
+            raise ValueError('Unterminated string')
+        idx = end
+
+
+def _skip_container(s, idx):
+    depth = 0
+    length = len(s)
+    while idx < length:
+        char = s[idx]
+        if char == '"':
+            idx = _skip_string(s, idx)
+        else:
+            if char in '[{':
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return idx + 1
+            idx += 1
+        idx = NO_BRACKETS.match(s, idx).end()
+    raise ValueError('Unterminated container')
+
+
+def _skip_value(s, idx):
+    """Return the index right after the JSON value starting at s[idx],
+    without decoding (nor fully validating) it
+    """
+    char = s[idx:idx + 1]
+    if char == '"':
+        return _skip_string(s, idx)
+    if char in ('{', '['):
+        return _skip_container(s, idx)
+    match = SCALAR.match(s, idx)
+    if match is None:
+        raise ValueError('Expecting value at char %d' % idx)
+    return match.end()
+
+
+def _decode_key(s, idx):
+    match = KEY.match(s, idx)
+    if match is not None:
+        return match.group(1), match.end()
+
+    # escaped characters in the key, or bad syntax
+    if s[idx:idx + 1] != '"':
+        raise ValueError('Expecting property name at char %d' % idx)
+    key, idx = scanstring(s, idx + 1)
+    idx = WHITESPACE.match(s, idx).end()
+    if s[idx:idx + 1] != ':':
+        raise ValueError("Expecting ':' delimiter at char %d" % idx)
+    return key, WHITESPACE.match(s, idx + 1).end()
+
+
+def _decode_object(s, idx, trie):
+    """Decode the JSON object starting at s[idx], keeping only the keys
+    present in trie. Return the object and the index where it ends.
+    """
+    if s[idx:idx + 1] != '{':
+        raise ValueError('Expecting object at char %d' % idx)
+
+    obj = {}
+    idx = WHITESPACE.match(s, idx + 1).end()
+    if s[idx:idx + 1] == '}':
+        return obj, idx + 1
+
+    while True:
+        key, idx = _decode_key(s, idx)
+        if key in trie:
+            subtrie = trie[key]
+            if subtrie is not None and s[idx:idx + 1] == '{':
+                obj[key], idx = _decode_object(s, idx, subtrie)
+            else:
+                obj[key], idx = _decoder.raw_decode(s, idx)
+        else:
+            idx = _skip_value(s, idx)
+
+        match = DELIMITER.match(s, idx)
+        if match is None:
+            raise ValueError("Expecting ',' delimiter at char %d" % idx)
+        if match.group(1) == '}':
+            return obj, match.end(1)
+        idx = match.end()
+
+
+def decode_paths(s, trie):
+    """Decode the JSON object in `s`, only with the values in the paths
+    of `trie` (see :func:`build_path_trie`). The values of other keys are
+    skipped over without being decoded.
+    """
+    obj, idx = _decode_object(s, WHITESPACE.match(s).end(), trie)
+    if WHITESPACE.match(s, idx).end() != len(s):
+        raise ValueError('Extra data at char %d' % idx)
+    return obj
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""Statistics about the flattening of each field
+"""
+from __future__ import unicode_literals, print_function, absolute_import
+from collections import OrderedDict
+
+import time
+
+timer = getattr(time, 'perf_counter', time.time)
+
+
+def length_bucket(length):
+    """Return the histogram bucket for an array length: the smallest power
+    of two greater than or equal to it (0 for empty arrays)
+    """
+    if length <= 1:
+        return length
+    return 1 << (length - 1).bit_length()
+
+
+class FieldStats(object):
+    """Statistics for a single field: time spent getting and serializing
+    its values, number of missing (None) values, array lengths histogram
+    and number of calls to the serializer
+    """
+    def __init__(self, name):
+        self.name = name
+        self.reset()
+
+    def reset(self):
+        self.time = 0.0
+        self.missing = 0
+        self.serializer_calls = 0
+        self.array_lengths = {}
+
+    def add_array_length(self, length):
+        bucket = length_bucket(length)
+        self.array_lengths[bucket] = self.array_lengths.get(bucket, 0) + 1
+
+    def merge(self, other):
+        self.time += other.time
+        self.missing += other.missing
+        self.serializer_calls += other.serializer_calls
+        for bucket, count in other.array_lengths.items():
+            self.array_lengths[bucket] = self.array_lengths.get(bucket, 0) + count
+
+    def as_dict(self):
+        return {
+            'name': self.name,
+            'time': self.time,
+            'missing': self.missing,
+            'serializer_calls': self.serializer_calls,
+            'array_lengths': dict(self.array_lengths),
+        }
+
+    def __repr__(self):
+        return '<FieldStats %r time=%.6f missing=%d serializer_calls=%d>' % (
+            self.name, self.time, self.missing, self.serializer_calls)
+
+
+class FlatsonStats(object):
+    """Statistics collected while flattening objects, with a
+    :class:`FieldStats` for each field (accessible by field name)
+    """
+    def __init__(self, fieldnames):
+        self.records = 0
+        self.fields = OrderedDict((name, FieldStats(name)) for name in fieldnames)
+
+    def __getitem__(self, fieldname):
+        return self.fields[fieldname]
+
+    def reset(self):
+        """Zero all the statistics
+        """
+        self.records = 0
+        for field_stats in self.fields.values():
+            field_stats.reset()
+
+    def merge(self, other):
+        """Add the statistics collected by another instance (e.g., in
+        another process) to this one. Return this instance.
+        """
+        self.records += other.records
+        for name, field_stats in other.fields.items():
+            if name not in self.fields:
+                self.fields[name] = FieldStats(name)
+            self.fields[name].merge(field_stats)
+        return self
+
+    def as_dict(self):
+        return {
+            'records': self.records,
+            'fields': [f.as_dict() for f in self.fields.values()],
+        }
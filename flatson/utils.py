@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals, print_function, absolute_import
+
+from collections import OrderedDict
+from itertools import islice
+
+import sys
+
+if sys.version_info[0] == 2:
+    string_types = (str, unicode)  # NOQA
+    integer_types = (int, long)  # NOQA
+else:
+    string_types = (str,)
+    integer_types = (int,)
+
+try:
+    move_to_end = OrderedDict.move_to_end
+except AttributeError:  # Python 2
+    def move_to_end(ordered_dict, key):
+        ordered_dict[key] = ordered_dict.pop(key)
+
+
+def single_type(schema_type):
+    """Return the type of a schema, given as a name or as a list of names
+    (e.g., ``['object', 'null']``): the only one besides 'null', or among
+    several, the only one of 'object' and 'array' (e.g., for ``['array',
+    'string']``, as arrays are serialized and objects flattened), or None
+    """
+    if isinstance(schema_type, list):
+        types = [t for t in schema_type if t != 'null']
+        if len(types) > 1:
+            types = [t for t in types if t in ('object', 'array')]
+        return types[0] if len(types) == 1 else None
+    return schema_type
+
+
+def iter_chunks(iterable, size):
+    """Yield lists with up to `size` consecutive items from `iterable`
+    """
+    if size < 1:
+        raise ValueError('Chunk size should be a positive number, got %r' % size)
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class LRUCache(object):
+    """A mapping keeping only the `maxsize` most recently used entries
+    """
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        try:
+            value = self._data[key]
+        except KeyError:
+            return default
+        move_to_end(self._data, key)
+        return value
+
+    def put(self, key, value):
+        self._data.pop(key, None)
+        self._data[key] = value
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
@@ -32,6 +32,11 @@ setup(
     package_dir={'flatson':
                  'flatson'},
     include_package_data=True,
+    entry_points={
+        'console_scripts': [
+            'flatson = flatson.cli:main',
+        ],
+    },
     install_requires=requirements,
     license="BSD",
     zip_safe=False,
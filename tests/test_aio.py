@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals, print_function, absolute_import
+
+import threading
+import time
+import unittest
+
+try:
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError:  # Python 2
+    asyncio = None
+
+from flatson import Flatson
+
+SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'name': {'type': 'string'},
+        'tags': {'type': 'array', 'items': {'type': 'string'}},
+    },
+}
+
+
+class AsyncIterator(object):
+    """Async iterator over the items of a list, counting the items read
+    """
+    def __init__(self, items, error=None):
+        self.items = list(items)
+        self.error = error
+        self.read = 0
+
+    def __aiter__(self):
+        return self
+
+    def __anext__(self):
+        if self.read == len(self.items):
+            if self.error is not None:
+                raise self.error
+            raise StopAsyncIteration  # NOQA
+        self.read += 1
+        return asyncio.sleep(0, result=self.items[self.read - 1])
+
+
+def collect(agen, limit=None):
+    """Run the event loop to get the items of an async generator
+    """
+    loop = asyncio.new_event_loop()
+    items = []
+    try:
+        while limit is None or len(items) < limit:
+            try:
+                items.append(loop.run_until_complete(agen.__anext__()))
+            except StopAsyncIteration:  # NOQA
+                break
+        loop.run_until_complete(agen.aclose())
+    finally:
+        loop.close()
+    return items
+
+
+@unittest.skipIf(asyncio is None, 'asyncio is not available')
+class TestAsyncFlatten(unittest.TestCase):
+    def setUp(self):
+        self.flatson = Flatson(SCHEMA)
+        self.objects = [{'name': str(i), 'tags': [str(i)]} for i in range(25)]
+
+    def test_aflatten(self):
+        rows = collect(self.flatson.aflatten(AsyncIterator(self.objects), batch_size=4))
+        self.assertEqual([self.flatson.flatten(obj) for obj in self.objects], rows)
+
+    def test_aflatten_stops_reading_when_rows_are_not_consumed(self):
+        source = AsyncIterator(self.objects)
+        rows = collect(self.flatson.aflatten(source, batch_size=2, max_pending=2), limit=1)
+        self.assertEqual([['0', '["0"]']], rows)
+        # the batch being consumed, two pending and one waiting to be queued
+        self.assertTrue(source.read <= 8)
+
+    def test_aflatten_raises_input_errors(self):
+        source = AsyncIterator(self.objects[:3], error=KeyError('boom'))
+        with self.assertRaises(KeyError):
+            collect(self.flatson.aflatten(source, batch_size=2))
+
+    def test_aflatten_raises_flattening_errors(self):
+        source = AsyncIterator([{'name': 'a'}, {'name': {}, 'tags': 'x'}, 1])
+        with self.assertRaises(AttributeError):
+            collect(self.flatson.aflatten(source, batch_size=2))
+
+    def test_aflatten_flattens_one_batch_at_a_time(self):
+        flatten = self.flatson.flatten
+        lock = threading.Lock()
+        running = []
+        overlaps = []
+
+        def slow_flatten(obj):
+            with lock:
+                overlaps.append(len(running))
+                running.append(obj)
+            time.sleep(0.001)
+            with lock:
+                running.remove(obj)
+            return flatten(obj)
+
+        self.flatson.flatten = slow_flatten
+        executor = ThreadPoolExecutor(4)
+        try:
+            rows = collect(self.flatson.aflatten(AsyncIterator(self.objects), batch_size=2,
+                                                 max_pending=4, executor=executor))
+        finally:
+            executor.shutdown()
+        self.assertEqual([flatten(obj) for obj in self.objects], rows)
+        self.assertEqual([0] * len(self.objects), overlaps)
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals, print_function, absolute_import
+
+"""
+test_cli
+----------------------------------
+
+Tests for `flatson.cli` module.
+"""
+
+import gzip
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from flatson.cli import main
+
+
+SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'name': {'type': 'string'},
+        'address': {
+            'type': 'object',
+            'properties': {'city': {'type': 'string'}},
+        },
+        'skills': {'type': 'array', 'items': {'type': 'string'}},
+    },
+}
+
+
+class TestCli(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.schemafile = self._write('schema.json', json.dumps(SCHEMA))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _write(self, name, content):
+        path = os.path.join(self.tmpdir, name)
+        with io.open(path, 'wb') as f:
+            f.write(content.encode('utf-8'))
+        return path
+
+    def _read(self, path):
+        with io.open(path, encoding='utf-8', newline='') as f:
+            return f.read()
+
+    def test_flatten_jsonlines_to_csv(self):
+        # given:
+        input1 = self._write('input1.jl', '\n'.join([
+            json.dumps({'name': 'Claudio', 'address': {'city': 'Paris'},
+                        'skills': ['hacking', 'soccer']}),
+            '',
+            json.dumps({'name': 'Zé', 'skills': []}),
+        ]))
+        input2 = self._write('input2.jl', json.dumps({'name': 'Salazar'}) + '\n')
+        output = os.path.join(self.tmpdir, 'output.csv')
+
+        # when:
+        exit_code = main(['-q', '-o', output, self.schemafile, input1, input2])
+
+        # then:
+        self.assertEquals(0, exit_code)
+        expected = ('address.city,name,skills\r\n'
+                    'Paris,Claudio,"[""hacking"",""soccer""]"\r\n'
+                    ',Zé,[]\r\n'
+                    ',Salazar,null\r\n')
+        self.assertEquals(expected, self._read(output))
+
+    def test_flatten_without_header(self):
+        input1 = self._write('input.jl', json.dumps({'name': 'Claudio'}))
+        output = os.path.join(self.tmpdir, 'output.csv')
+
+        main(['-q', '--no-header', '--batch-size', '1', '-o', output,
+              self.schemafile, input1])
+
+        self.assertEquals(',Claudio,null\r\n', self._read(output))
+
+    def test_flatten_compressed_files(self):
+        # given:
+        input1 = os.path.join(self.tmpdir, 'input.jl.gz')
+        with gzip.GzipFile(input1, 'wb') as f:
+            f.write(json.dumps({'name': 'Zé'}).encode('utf-8'))
+        output = os.path.join(self.tmpdir, 'output.csv.gz')
+
+        # when:
+        main(['-q', '--no-header', '--background-io', '-o', output,
+              self.schemafile, input1])
+
+        # then:
+        with gzip.GzipFile(output, 'rb') as f:
+            self.assertEquals(',Zé,null\r\n', f.read().decode('utf-8'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals, print_function, absolute_import
+
+import unittest
+from datetime import date, datetime
+
+from flatson import Flatson
+from flatson.coercion import (CoercionError, Coercer, to_boolean, to_datetime, to_integer,
+                              to_string)
+
+SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'price': {'type': 'number'},
+        'stock': {'type': 'integer'},
+        'available': {'type': 'boolean'},
+        'name': {'type': 'string'},
+        'day': {'type': 'string', 'format': 'date'},
+        'updated': {'type': 'string', 'format': 'date-time'},
+        'tags': {'type': 'array', 'items': {'type': 'string'}},
+        'other': {'type': ['integer', 'null']},
+    },
+}
+
+
+class TestConverters(unittest.TestCase):
+    def test_to_integer(self):
+        self.assertEqual(3, to_integer(3))
+        self.assertEqual(3, to_integer(3.0))
+        self.assertEqual(3, to_integer('3'))
+        for value in (3.5, True, '3.5', 'x'):
+            self.assertRaises((TypeError, ValueError), to_integer, value)
+
+    def test_to_boolean(self):
+        self.assertEqual([True, False, True, False],
+                         [to_boolean(v) for v in (True, 'false', 1, '0')])
+        self.assertRaises(KeyError, to_boolean, 'yes')
+        self.assertRaises(TypeError, to_boolean, 2)
+
+    def test_to_string(self):
+        self.assertEqual(['a', '1', '1.5', 'true'],
+                         [to_string(v) for v in ('a', 1, 1.5, True)])
+        self.assertRaises(TypeError, to_string, {})
+
+    def test_to_datetime(self):
+        expected = datetime(2015, 9, 25, 10, 30)
+        for value in ('2015-09-25T10:30:00', '2015-09-25T10:30:00Z', '2015-09-25t10:30:00z',
+                      '2015-09-25T12:30:00+02:00', '2015-09-25T05:00:00-05:30',
+                      '2015-09-25 10:30:00.000000000Z'):
+            self.assertEqual(expected, to_datetime(value))
+        self.assertEqual(datetime(2015, 9, 25, 23, 59, 59, 123456),
+                         to_datetime('2015-09-26T01:59:59.123456789+02:00'))
+        for value in ('2015-09-25', '2015-09-25T10:30', '2015-13-25T10:30:00',
+                      '2015-09-25T10:30:00+0200'):
+            self.assertRaises(ValueError, to_datetime, value)
+        self.assertRaises(TypeError, to_datetime, 12345)
+
+
+class TestCoercion(unittest.TestCase):
+    def test_flatten_coerced(self):
+        f = Flatson(SCHEMA, coerce='null')
+        obj = {'price': '9.5', 'stock': 2.0, 'available': 'true', 'name': 12,
+               'day': '2015-09-25', 'updated': '2015-09-25T10:30:00Z',
+               'tags': ['a'], 'other': '7'}
+        expected = [True, date(2015, 9, 25), '12', 7, 9.5, 2, '["a"]',
+                    datetime(2015, 9, 25, 10, 30)]
+        self.assertEqual(['available', 'day', 'name', 'other', 'price', 'stock', 'tags',
+                          'updated'], f.fieldnames)
+        self.assertEqual(expected, f.flatten(obj))
+        self.assertEqual(expected, f.compile().flatten(obj))
+        self.assertEqual([None] * 6 + ['null', None], f.flatten({}))
+
+    def test_null_policy(self):
+        f = Flatson(SCHEMA, coerce='null')
+        row = f.flatten({'price': 'free', 'stock': 1.5, 'day': '25/09/2015'})
+        self.assertEqual([None, None, None, None, None, None, 'null', None], row)
+        row = f.flatten({'day': 20150925, 'updated': 12345})
+        self.assertEqual([None, None, None, None, None, None, 'null', None], row)
+
+    def test_raise_policy(self):
+        f = Flatson(SCHEMA, coerce='raise')
+        with self.assertRaises(ValueError):
+            f.flatten({'price': 'free'})
+
+    def test_collect_policy(self):
+        f = Flatson(SCHEMA, coerce='collect')
+        rows = f.flatten_many([{'price': 1}, {'price': 'free', 'stock': 'x'}])
+        self.assertEqual([1.0, None], [row[4] for row in rows])
+        self.assertEqual([(1, 'price', 'free'), (1, 'stock', 'x')],
+                         [e[:3] for e in f.coercer.errors])
+        self.assertTrue(all(isinstance(e, CoercionError) for e in f.coercer.errors))
+
+        f.flatten({'available': 'maybe'})
+        self.assertEqual((2, 'available', 'maybe'), f.coercer.errors[-1][:3])
+
+    def test_collect_policy_in_worker_processes(self):
+        f = Flatson(SCHEMA, coerce='collect')
+        data = [{'stock': i if i % 4 else 'x'} for i in range(10)]
+
+        rows = list(f.flatten_parallel(data, workers=2, chunksize=3))
+
+        self.assertEqual([None, 1, 2, 3, None, 5, 6, 7, None, 9], [row[5] for row in rows])
+        self.assertEqual(10, f.coercer.records)
+        self.assertEqual([0, 4, 8], [e.record for e in f.coercer.errors])
+
+    def test_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            Coercer([], 'ignore')
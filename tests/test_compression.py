@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals, print_function, absolute_import
+
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+
+from flatson.compression import detect_compression, lzma, open_input, open_output
+
+DATA = ''.join('{"id": %d, "name": "item"}\n' % i for i in range(5000)).encode('ascii')
+
+EXTENSIONS = ['.jl', '.jl.gz', '.jl.bz2'] + (['.jl.xz'] if lzma is not None else [])
+
+
+class TestCompression(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _path(self, name):
+        return os.path.join(self.tmpdir, name)
+
+    def test_detect_compression_from_extension(self):
+        self.assertEqual('gzip', detect_compression('items.jl.gz', 'wb'))
+        self.assertEqual('bz2', detect_compression('items.jl.bz2', 'wb'))
+        self.assertEqual('xz', detect_compression('items.jl.xz', 'wb'))
+        self.assertEqual(None, detect_compression('items.jl', 'wb'))
+
+    def test_detect_compression_from_magic_bytes(self):
+        path = self._path('items')
+        with gzip.GzipFile(path, 'wb') as f:
+            f.write(DATA)
+        self.assertEqual('gzip', detect_compression(path))
+        with open_input(path) as f:
+            self.assertEqual(DATA, f.read())
+
+    def test_write_and_read(self):
+        for extension in EXTENSIONS:
+            for threaded in (False, True):
+                path = self._path('items' + extension)
+
+                with open_output(path, threaded=threaded, block_size=1000) as f:
+                    for line in DATA.splitlines(True):
+                        f.write(line)
+                with open_input(path, threaded=threaded, block_size=1000) as f:
+                    lines = list(f)
+
+                self.assertEqual(DATA.splitlines(True), lines)
+                self.assertEqual(extension != '.jl', os.path.getsize(path) < len(DATA))
+
+    def test_close_input_before_the_end(self):
+        path = self._path('items.jl.gz')
+        with open_output(path) as f:
+            f.write(DATA)
+        with open_input(path, threaded=True, block_size=100) as f:
+            self.assertEqual(DATA[:10], f.read(10))
+
+    def test_threaded_read_errors(self):
+        path = self._path('items.jl.gz')
+        with open(path, 'wb') as f:
+            f.write(b'\x1f\x8bnot really gzip')
+        with self.assertRaises((IOError, OSError)):
+            with open_input(path, threaded=True) as f:
+                f.read()
+
+    def test_threaded_read_errors_are_raised_again(self):
+        path = self._path('items.jl.gz')
+        with open(path, 'wb') as f:
+            f.write(b'\x1f\x8bnot really gzip')
+        with open_input(path, threaded=True) as f:
+            for _ in range(2):
+                with self.assertRaises((IOError, OSError)):
+                    f.read()
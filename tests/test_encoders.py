@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals, print_function, absolute_import
+
+"""
+test_encoders
+----------------------------------
+
+Tests for `flatson.encoders` module.
+"""
+
+import json
+import random
+import unittest
+
+from flatson.encoders import JSON_BACKENDS, get_json_backend, dumps_stdlib
+
+
+VALUES = [
+    None,
+    [],
+    [1, 2, 3, -4, 2 ** 63, 2 ** 70],
+    [0.0, -0.0, 1.0, 0.1, 0.0001, 0.00012, 1e-05, 1.5e-07, 1e16, 1e+22, 1.7976931348623157e+308],
+    [float('nan'), float('inf'), float('-inf')],
+    ['hello', 'Zé', ' ', '\x00\x1f\x7f', '\b\f\t\n\r"\\/', 'null', '1e5', '0.00001'],
+    [True, False, None],
+    [{'b': 1, 'a': [{'d': None, 'c': 'x'}]}, {'é': 1, 'e': 2}],
+    [{1: 'a', 2: 'b'}],
+    [[1, [2, [3, {}]]]],
+    ('a', 'tuple'),
+]
+
+
+def _random_values(count, seed=42):
+    rnd = random.Random(seed)
+    for _ in range(count):
+        yield [rnd.random() * 10 ** rnd.randint(-30, 30),
+               rnd.randint(-10 ** 6, 10 ** 6) / 7.0,
+               float(rnd.randint(0, 10 ** 17)),
+               rnd.randint(-2 ** 65, 2 ** 65)]
+
+
+class TestJsonBackends(unittest.TestCase):
+    def _check_same_as_json_dumps(self, dumps, values):
+        for value in values:
+            expected = json.dumps(value, separators=(',', ':'), sort_keys=True)
+            self.assertEquals(expected, dumps(value))
+
+    def test_backends_give_same_output_as_json_dumps(self):
+        for name, dumps in JSON_BACKENDS.items():
+            self._check_same_as_json_dumps(dumps, VALUES)
+            self._check_same_as_json_dumps(dumps, _random_values(5000))
+
+    def test_unsupported_values_raise_like_json_dumps(self):
+        for dumps in JSON_BACKENDS.values():
+            with self.assertRaises(TypeError):
+                dumps([set([1])])
+
+    def test_get_json_backend(self):
+        self.assertTrue(get_json_backend('json') is dumps_stdlib)
+        self.assertTrue(get_json_backend('auto') in JSON_BACKENDS.values())
+        with self.assertRaises(ValueError):
+            get_json_backend('nope')
+
+    @unittest.skipIf('orjson' not in JSON_BACKENDS, 'orjson is not available')
+    def test_auto_uses_orjson(self):
+        self.assertTrue(get_json_backend('auto') is JSON_BACKENDS['orjson'])
+
+
+if __name__ == '__main__':
+    unittest.main()
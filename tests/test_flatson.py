@@ -9,12 +9,18 @@ test_flatson
 Tests for `flatson` module.
 """
 
+import gzip
+import io
 import json
 import os
+import pickle
 import skinfer
 import unittest
+from array import array
 
 from flatson import Flatson
+from flatson.columns import numpy
+from flatson.encoders import JSON_BACKENDS
 import tempfile
 
 
@@ -51,6 +57,17 @@ class TestFlatson(unittest.TestCase):
         finally:
             os.remove(fname)
 
+    def test_create_from_compressed_schemafile(self):
+        _, fname = tempfile.mkstemp(suffix='.json.gz')
+        try:
+            with gzip.GzipFile(fname, 'wb') as f:
+                f.write(json.dumps(SIMPLE_SCHEMA).encode('utf-8'))
+
+            obj = Flatson.from_schemafile(fname)
+            self.assertEquals(SIMPLE_SCHEMA, obj.schema)
+        finally:
+            os.remove(fname)
+
     def test_no_support_for_list_objects(self):
         with self.assertRaises(ValueError):
             Flatson(schema=LIST_SCHEMA)
@@ -92,6 +109,40 @@ class TestFlatson(unittest.TestCase):
         expected = {'first': 'hello', 'second.one': 1, 'second.two': 2}
         self.assertEquals(expected, f.flatten_dict(contain_nested_object))
 
+    def test_flatten_row(self):
+        contain_nested_object = {'first': 'hello', 'second': {'one': 1, 'two': 2}}
+        schema = skinfer.generate_schema(contain_nested_object)
+        f = Flatson(schema=schema)
+
+        row = f.flatten_row(contain_nested_object)
+
+        self.assertEquals(['hello', 1, 2], list(row))
+        self.assertEquals(2, row['second.two'])
+        self.assertEquals(f.flatten_dict(contain_nested_object), row.as_ordered_dict())
+        self.assertTrue(f.flatten_row({}).layout is row.layout)
+
+    def test_flatten_lazy(self):
+        serialized = []
+        schema = {
+            'type': 'object',
+            'properties': {
+                'name': {'type': 'string'},
+                'age': {'type': 'integer'},
+                'tags': {'type': 'array', 'flatson_serialize': {'method': 'join_tags'}},
+            }
+        }
+        f = Flatson(schema=schema, coerce='null')
+        f.register_serialization_method(
+            'join_tags', lambda v: serialized.append(v) or ','.join(v))
+        obj = {'name': 'Claudio', 'age': '42', 'tags': ['a', 'b']}
+
+        row = f.flatten_lazy(obj)
+
+        self.assertEquals(42, row['age'])
+        self.assertEquals([], serialized)
+        self.assertEquals(f.flatten_row(obj), row)
+        self.assertEquals(f.flatten(obj), list(row))
+
     def test_convert_deep_nested_objects(self):
         contain_nested_object = {
             'first': 'hello',
@@ -257,6 +308,607 @@ class TestFlatson(unittest.TestCase):
         with self.assertRaises(ValueError):
             f.register_serialization_method('extract_first', lambda _v, **kw: _v[2])
 
+    def test_json_backends(self):
+        # given:
+        schema = skinfer.generate_schema(SAMPLE_WITH_LIST_OF_OBJECTS)
+        expected = ['hello', json.dumps(SAMPLE_WITH_LIST_OF_OBJECTS['list'],
+                                        separators=(',', ':'), sort_keys=True)]
+
+        for backend in ['auto'] + list(JSON_BACKENDS):
+            # when:
+            f = Flatson(schema=schema, json_backend=backend)
+
+            # then:
+            self.assertEquals(expected, f.flatten(SAMPLE_WITH_LIST_OF_OBJECTS))
+            self.assertEquals(expected, f.compile().flatten(SAMPLE_WITH_LIST_OF_OBJECTS))
+
+    def test_unknown_json_backend(self):
+        with self.assertRaises(ValueError):
+            Flatson(schema=SIMPLE_SCHEMA, json_backend='nope')
+
+    def test_missing_serialization_method_fails_on_creation(self):
+        schema = skinfer.generate_schema(SAMPLE_WITH_LIST_OF_OBJECTS)
+        schema['properties']['list']['flatson_serialize'] = dict(separator='+')
+        with self.assertRaises(ValueError):
+            Flatson(schema=schema)
+
+    def test_unknown_serialization_method(self):
+        schema = skinfer.generate_schema(SAMPLE_WITH_LIST_OF_OBJECTS)
+        schema['properties']['list']['flatson_serialize'] = dict(method='always_one')
+        f = Flatson(schema=schema)
+        with self.assertRaises(ValueError):
+            f.flatten(SAMPLE_WITH_LIST_OF_OBJECTS)
+
+    def test_fields_have_serializers_bound(self):
+        # given:
+        sample = {'first': 'hello', 'list': ['one', 'two'], 'other': [1, 2]}
+        schema = skinfer.generate_schema(sample)
+        schema['properties']['list']['flatson_serialize'] = dict(method='join_values',
+                                                                 separator='|')
+        schema['properties']['other']['flatson_serialize'] = dict(method='custom')
+
+        # when:
+        f = Flatson(schema=schema)
+        first, list_field, other = f.fields
+
+        # then:
+        self.assertEquals([False, True, True], [fld.is_array() for fld in f.fields])
+        self.assertEquals(None, first.serialize)
+        self.assertEquals('one|two', list_field.serialize(['one', 'two']))
+
+        # and when:
+        f.register_serialization_method('custom', lambda _v, **kw: 'custom')
+
+        # then:
+        self.assertTrue(f.fields[1] is list_field)
+        self.assertEquals('custom', f.fields[2].serialize([1, 2]))
+        self.assertEquals(['hello', 'one|two', 'custom'], f.flatten(sample))
+
+    def test_compiled_flatten_gives_same_output(self):
+        # given:
+        sample = {
+            'first': 'hello',
+            'second': {'one': {'a': 1, 'b': 2}, 'list1': [1, 2, 3]},
+            'list': [{'key1': 'value1', 'key2': 'value2'}],
+            'tags': ['one', 'two'],
+        }
+        schema = skinfer.generate_schema(sample)
+        schema['properties']['list']['flatson_serialize'] = dict(method='extract_key_values')
+        schema['properties']['tags']['flatson_serialize'] = dict(method='join_values',
+                                                                 separator='+')
+        f = Flatson(schema=schema)
+        expected = f.flatten(sample)
+
+        # when:
+        result = f.compile().flatten(sample)
+
+        # then:
+        self.assertEquals(expected, result)
+        self.assertEquals(['hello', 'key1:value1,key2:value2', '[1,2,3]', 1, 2, 'one+two'],
+                          result)
+        self.assertEquals([None, '', 'null', None, None, ''],
+                          f.flatten({'first': None, 'list': [], 'tags': []}))
+
+    def test_flatten_nested_objects_sharing_prefixes(self):
+        # given: a key with the separator, sorted among the nested fields
+        schema = {
+            'type': 'object',
+            'properties': {
+                'a': {'type': 'object', 'properties': {
+                    'a': {'type': 'string'},
+                    'c': {'type': 'object', 'properties': {
+                        'x': {'type': 'string'},
+                        'y': {'type': 'array'},
+                    }},
+                }},
+                'a.b': {'type': 'string'},
+            },
+        }
+        sample = {'a': {'a': '1', 'c': {'x': '2', 'y': [3]}}, 'a.b': '4'}
+        f = Flatson(schema=schema)
+
+        # when:
+        result = f.flatten(sample)
+
+        # then:
+        self.assertEquals(['a.a', 'a.b', 'a.c.x', 'a.c.y'], f.fieldnames)
+        self.assertEquals(['1', '4', '2', '[3]'], result)
+        self.assertEquals(result, f.compile().flatten(sample))
+        self.assertEquals([None, None, None, 'null'], f.flatten({'a': {}}))
+
+    def test_compiled_flatten_dict(self):
+        schema = skinfer.generate_schema(SAMPLE_WITH_LIST_OF_OBJECTS)
+        f = Flatson(schema=schema).compile()
+        expected = {
+            'first': 'hello',
+            'list': '[{"key1":"value1","key2":"value2"},{"key1":"value3","key2":"value4"}]',
+        }
+        self.assertEquals(expected, f.flatten_dict(SAMPLE_WITH_LIST_OF_OBJECTS))
+
+    def test_compile_with_unknown_serialization_method(self):
+        schema = skinfer.generate_schema(SAMPLE_WITH_LIST_OF_OBJECTS)
+        schema['properties']['list']['flatson_serialize'] = dict(method='always_one')
+        f = Flatson(schema=schema)
+        with self.assertRaises(ValueError):
+            f.compile()
+
+    def test_register_custom_serialization_method_recompiles(self):
+        # given:
+        sample = {'first': 'hello', 'list': ['one', 'two']}
+        schema = skinfer.generate_schema(sample)
+        schema['properties']['list']['flatson_serialize'] = dict(method='custom')
+        f = Flatson(schema=schema)
+        f.register_serialization_method('custom', lambda _v, **kw: '1')
+        f.compile()
+
+        # when:
+        f.register_serialization_method('custom', lambda _v, **kw: '2')
+
+        # then:
+        self.assertEquals(['hello', '2'], f.flatten(sample))
+
+    def test_flatten_columns(self):
+        # given:
+        schema = skinfer.generate_schema({'name': 'x', 'price': 1.5, 'ok': True,
+                                          'tags': ['a'], 'address': {'city': 'x'}})
+        f = Flatson(schema=schema)
+        data = [
+            {'name': 'one', 'price': 10, 'ok': True, 'tags': ['a', 'b'],
+             'address': {'city': 'Paris'}},
+            {'name': 'two', 'ok': False, 'tags': []},
+            {'name': 'three', 'price': 2.5},
+        ]
+
+        # when:
+        batches = list(f.flatten_columns(data, batch_size=2, use_numpy=False))
+
+        # then:
+        self.assertEquals([2, 1], [b.size for b in batches])
+        self.assertEquals(f.fieldnames, list(batches[0].keys()))
+        self.assertEquals(['Paris', None], batches[0]['address.city'])
+        self.assertEquals(['one', 'two'], batches[0]['name'])
+        self.assertEquals(['["a","b"]', '[]'], batches[0]['tags'])
+        self.assertEquals(array(str('d'), [10.0, 0.0]), batches[0]['price'])
+        self.assertEquals(bytearray([0, 1]), batches[0].masks['price'])
+        self.assertEquals(array(str('b'), [1, 0]), batches[0]['ok'])
+        self.assertEquals(bytearray([0, 0]), batches[0].masks['ok'])
+        self.assertEquals(array(str('d'), [2.5]), batches[1]['price'])
+        self.assertEquals(bytearray([1]), batches[1].masks['ok'])
+
+    def test_flatten_columns_with_dictionary_encoding(self):
+        # given:
+        schema = skinfer.generate_schema({'currency': 'x', 'name': 'x', 'price': 1.5})
+        f = Flatson(schema=schema)
+        currencies = ['EUR', 'USD', 'EUR', None, 'EUR', 'EUR', 'EUR', 'USD', 'EUR', 'EUR', 'BRL']
+        data = [{'currency': c, 'name': str(i), 'price': i} for i, c in enumerate(currencies)]
+
+        for dictionary in (['currency'], 'auto'):
+            # when:
+            batches = f.flatten_columns(data, batch_size=10, use_numpy=False,
+                                        dictionary=dictionary)
+            first = next(batches)
+
+            # then:
+            self.assertEquals(array(str('i'), [0, 1, 0, -1, 0, 0, 0, 1, 0, 0]),
+                              first['currency'])
+            self.assertEquals(bytearray([0, 0, 0, 1, 0, 0, 0, 0, 0, 0]),
+                              first.masks['currency'])
+            self.assertEquals(['EUR', 'USD'], first.dictionaries['currency'])
+            self.assertEquals(['currency'], list(first.dictionaries))
+
+            second, = batches
+            self.assertEquals(array(str('i'), [2]), second['currency'])
+            self.assertEquals(['EUR', 'USD', 'BRL'], second.dictionaries['currency'])
+            self.assertTrue(first.dictionaries['currency'] is second.dictionaries['currency'])
+            self.assertEquals(['BRL'], second.decode('currency'))
+            self.assertEquals(['10'], second.decode('name'))
+
+        with self.assertRaises(ValueError):
+            list(f.flatten_columns(data, dictionary=['country']))
+
+    def test_flatten_columns_rejects_invalid_typed_values(self):
+        f = Flatson(schema={'type': 'object', 'properties': {
+            'price': {'type': 'number'}, 'stock': {'type': 'integer'}, 'ok': {'type': 'boolean'},
+        }})
+        for use_numpy in ([False, True] if numpy is not None else [False]):
+            for obj in ({'price': 'free'}, {'price': '1.5'}, {'stock': 1.7},
+                        {'stock': '12'}, {'ok': 'false'}):
+                with self.assertRaises(ValueError):
+                    list(f.flatten_columns([obj], use_numpy=use_numpy))
+
+    def test_flatten_columns_with_union_types(self):
+        schema = {'type': 'object', 'properties': {
+            'price': {'type': ['number', 'null']},
+            'code': {'type': ['integer', 'string']},
+        }}
+        f = Flatson(schema=schema)
+        batch, = f.flatten_columns([{'price': 3, 'code': 'x'}, {'code': 1}], use_numpy=False)
+        self.assertEquals(array(str('d'), [3.0, 0.0]), batch['price'])
+        self.assertEquals(bytearray([0, 1]), batch.masks['price'])
+        self.assertEquals(['x', 1], batch['code'])
+
+    @unittest.skipIf(numpy is None, 'NumPy is not available')
+    def test_flatten_columns_with_numpy(self):
+        schema = skinfer.generate_schema({'price': 1.5, 'name': 'x'})
+        f = Flatson(schema=schema)
+        batch, = f.flatten_columns([{'price': 3, 'name': 'a'}, {}], use_numpy=True)
+        self.assertEquals([3.0, 0.0], batch['price'].tolist())
+        self.assertEquals([False, True], batch.masks['price'].tolist())
+        self.assertEquals(['a', None], batch['name'])
+
+    def test_flatten_parallel(self):
+        # given:
+        schema = skinfer.generate_schema(SAMPLE_WITH_LIST_OF_OBJECTS)
+        schema['properties']['list']['flatson_serialize'] = dict(method='always_one')
+        f = Flatson(schema=schema)
+        f.register_serialization_method('always_one', lambda _v, **kw: '1')
+        data = [{'first': str(i), 'list': []} for i in range(50)]
+
+        # when:
+        result = list(f.flatten_parallel(data, workers=2, chunksize=3))
+
+        # then:
+        self.assertEquals([f.flatten(obj) for obj in data], result)
+
+    def test_flatten_parallel_unordered(self):
+        schema = skinfer.generate_schema(SAMPLE_WITH_LIST_OF_OBJECTS)
+        f = Flatson(schema=schema).compile()
+        data = [{'first': '%03d' % i} for i in range(50)]
+
+        result = f.flatten_parallel(iter(data), workers=3, chunksize=4, ordered=False)
+
+        self.assertEquals([f.flatten(obj) for obj in data], sorted(result))
+
+    def test_nested_objects_with_custom_field_separator(self):
+        contain_nested_object = {'first': 'hello', 'second': {'one': {'a': 1}}}
+        schema = skinfer.generate_schema(contain_nested_object)
+        f = Flatson(schema=schema, field_sep='_')
+        self.assertEquals(['first', 'second_one_a'], f.fieldnames)
+        self.assertEquals(['hello', 1], f.flatten(contain_nested_object))
+
+    def test_unflatten(self):
+        # given:
+        sample = {
+            'first': 'hello',
+            'second': {'one': {'a': 1}, 'list1': [1, {'b': 2}]},
+            'tags': ['one', 'two'],
+            'list': [{'key1': 'value1', 'key2': 'value2'}],
+        }
+        schema = skinfer.generate_schema(sample)
+        schema['properties']['list']['flatson_serialize'] = dict(method='extract_key_values')
+        schema['properties']['tags']['flatson_serialize'] = dict(method='join_values',
+                                                                 separator='+')
+        f = Flatson(schema=schema)
+        other = {'first': 'bye', 'second': {'one': {}}, 'tags': [], 'list': []}
+        rows = [f.flatten(sample), f.flatten(other)]
+
+        # when:
+        result = f.unflatten_many(rows)
+
+        # then:
+        self.assertEquals([sample, {'first': 'bye', 'tags': [], 'list': []}], result)
+        self.assertEquals(sample, f.unflatten(f.flatten_dict(sample)))
+
+    def test_unflatten_empty_objects_in_key_values(self):
+        schema = skinfer.generate_schema({'list': [{'a': 'x'}]})
+        schema['properties']['list']['flatson_serialize'] = dict(method='extract_key_values')
+        f = Flatson(schema=schema)
+        for value in ([{'a': '1'}, {}], [{}, {}], [{}, {'a': '1', 'b': '2'}, {}]):
+            obj = {'list': value}
+            self.assertEquals(obj, f.unflatten(f.flatten(obj)))
+
+    def test_unflatten_with_registered_inverse(self):
+        # given:
+        schema = skinfer.generate_schema(SAMPLE_WITH_LIST_OF_TUPLES)
+        schema['properties']['list']['flatson_serialize'] = dict(method='pairs')
+        f = Flatson(schema=schema)
+        f.register_serialization_method('pairs', lambda v: ' '.join('='.join(p) for p in v))
+
+        # then:
+        row = f.flatten(SAMPLE_WITH_LIST_OF_TUPLES)
+        self.assertEquals(['hello', 'value1=value2 value3=value4'], row)
+        with self.assertRaises(ValueError):
+            f.unflatten(row)
+
+        # and when:
+        f.register_serialization_method('pairs', lambda v: ' '.join('='.join(p) for p in v),
+                                        lambda s: [p.split('=') for p in s.split(' ')])
+
+        # then:
+        self.assertEquals(SAMPLE_WITH_LIST_OF_TUPLES, f.unflatten(row))
+
+    def test_adaptive_mode_adds_fields_for_new_keys(self):
+        # given:
+        schema = skinfer.generate_schema({'first': 'hello', 'second': {'one': 1}})
+        f = Flatson(schema=schema, adaptive=True)
+
+        # when:
+        rows = [
+            f.flatten({'first': 'a', 'second': {'one': 1}}),
+            f.flatten({'first': 'b', 'second': {'one': 2, 'two': 'x'}, 'tags': ['t']}),
+            f.flatten({'third': {'deep': {'er': True}, 'empty': {}}}),
+        ]
+
+        # then:
+        self.assertEquals(['first', 'second.one', 'second.two', 'tags', 'third.deep.er'],
+                          f.fieldnames)
+        self.assertEquals([['a', 1, None, None, None],
+                           ['b', 2, 'x', '["t"]', None],
+                           [None, None, None, 'null', True]], list(f.backfill(rows)))
+        self.assertEquals({'type': 'string'},
+                          f.schema['properties']['second']['properties']['two'])
+        self.assertEquals({'type': 'array'}, f.schema['properties']['tags'])
+        self.assertFalse('tags' in schema['properties'])
+        self.assertEquals(sorted(f.fieldnames), Flatson(f.schema).fieldnames)
+
+    def test_adaptive_mode_in_batches(self):
+        schema = skinfer.generate_schema({'first': 'hello'})
+        f = Flatson(schema=schema, adaptive=True, coerce='null').compile()
+
+        rows = f.flatten_many([{'first': 'a'}, {'first': 'b', 'n': 1}])
+        rows += [f.flatten_bytes('{"first": "c", "m": "x"}')]
+
+        self.assertEquals(['first', 'n', 'm'], f.fieldnames)
+        self.assertEquals([['a', None], ['b', 1], ['c', None, 'x']], rows)
+        with self.assertRaises(ValueError):
+            list(f.flatten_parallel([{}]))
+        with self.assertRaises(ValueError):
+            f.flatten_columns([{}])
+
+    def test_adaptive_mode_with_dicts_and_rows(self):
+        schema = skinfer.generate_schema({'a': 'x'})
+        f = Flatson(schema=schema, adaptive=True)
+
+        self.assertEquals([('a', 'y'), ('z', 1)],
+                          list(f.flatten_dict({'a': 'y', 'z': 1}).items()))
+        row = f.flatten_row({'a': 'y', 'w': 2})
+        self.assertEquals(2, row['w'])
+        self.assertEquals(len(row.layout), len(row.values))
+
+    def test_adaptive_mode_waits_for_non_null_values(self):
+        schema = skinfer.generate_schema({'a': 'x'})
+        f = Flatson(schema=schema, adaptive=True)
+
+        rows = [f.flatten({'a': 'x', 'k': None, 't': None}),
+                f.flatten({'a': 'y', 'k': {'p': 1}, 't': ['p', 'q']})]
+
+        self.assertEquals(['a', 'k.p', 't'], f.fieldnames)
+        self.assertEquals([['x'], ['y', 1, '["p","q"]']], rows)
+
+    def test_select_fields(self):
+        # given:
+        sample = {
+            'first': 'hello',
+            'second': {'one': {'a': 1, 'b': 2}, 'list1': [1, 2, 3]},
+            'tags': ['one', 'two'],
+        }
+        schema = skinfer.generate_schema(sample)
+        schema['properties']['tags']['flatson_serialize'] = dict(method='custom')
+        f = Flatson(schema=schema)
+        calls = []
+        f.register_serialization_method('custom', lambda v, **kw: calls.append(v))
+
+        # when:
+        selected = f.select(['second.one.*', 'first'])
+
+        # then:
+        self.assertEquals(['first', 'second.one.a', 'second.one.b'], selected.fieldnames)
+        self.assertEquals(['hello', 1, 2], selected.flatten(sample))
+        self.assertEquals(['hello', 1, 2], selected.compile().flatten(sample))
+        self.assertEquals(['hello', 1, 2], selected.flatten_bytes(json.dumps(sample)))
+        self.assertEquals([], calls)
+        self.assertEquals(5, len(f.fieldnames))
+        self.assertEquals(['tags'], f.select('tags').fieldnames)
+        f.select('tags').flatten(sample)
+        self.assertEquals([['one', 'two']], calls)
+        selected.register_serialization_method('other', lambda v: '', lambda s: [])
+        self.assertFalse('other' in f._serialization_methods)
+        self.assertFalse('other' in f._inverse_methods)
+        with self.assertRaises(ValueError):
+            f.select(['first', 'third.*'])
+
+    def test_pickle(self):
+        # given:
+        schema = skinfer.generate_schema(SAMPLE_WITH_LIST_OF_OBJECTS)
+        schema['properties']['list']['flatson_serialize'] = dict(method='extract_key_values')
+        f = Flatson(schema=schema)
+
+        for flatson in (f, Flatson(schema=schema).compile()):
+            # when:
+            unpickled = pickle.loads(pickle.dumps(flatson))
+
+            # then:
+            self.assertEquals(flatson.fieldnames, unpickled.fieldnames)
+            self.assertEquals(flatson.flatten(SAMPLE_WITH_LIST_OF_OBJECTS),
+                              unpickled.flatten(SAMPLE_WITH_LIST_OF_OBJECTS))
+
+    def test_reuse_fields_inferred_for_same_schema(self):
+        # given:
+        schema = skinfer.generate_schema(SAMPLE_WITH_LIST_OF_OBJECTS)
+        f = Flatson(schema=schema)
+
+        # when:
+        same_schema = json.loads(json.dumps(schema))
+        other_sep = Flatson(schema=same_schema, field_sep='_')
+        same = Flatson(schema=same_schema)
+
+        # then:
+        self.assertEquals(f.fields, same.fields)
+        self.assertTrue(all(a is b for a, b in zip(f.fields, same.fields)))
+        self.assertFalse(any(a is b for a, b in zip(f.fields, other_sep.fields)))
+
+    def test_changing_schema_after_creation_does_not_change_cached_fields(self):
+        # given:
+        sample = {'first': 'hello', 'list': [1, 2]}
+        schema = skinfer.generate_schema(sample)
+        f = Flatson(schema=schema)
+
+        # when:
+        schema['properties']['list']['flatson_serialize'] = dict(method='join_values')
+        Flatson(schema=schema)
+        del schema['properties']['list']['flatson_serialize']
+
+        # then:
+        self.assertEquals(['hello', '[1,2]'], Flatson(schema=schema).flatten(sample))
+        self.assertEquals(['hello', '[1,2]'], f.flatten(sample))
+
+    def test_flatten_bytes(self):
+        # given:
+        sample = {
+            'first': 'hello',
+            'second': {'one': {'a': 1, 'b': 2}, 'list1': [1, 2, 3]},
+            'list': [{'key1': 'value1', 'key2': 'value2'}],
+        }
+        schema = skinfer.generate_schema(sample)
+        f = Flatson(schema=schema)
+        obj = dict(sample, html='<p class="x">{</p>' * 100, extra={'a': [{'b': 1}]})
+
+        # when:
+        result = f.flatten_bytes(json.dumps(obj).encode('utf-8'))
+
+        # then:
+        self.assertEquals(f.flatten(sample), result)
+        self.assertEquals([None, 'null', 'null', None, None], f.flatten_bytes('{"second": {}}'))
+
+    def test_flatten_stream(self):
+        schema = skinfer.generate_schema(SAMPLE_WITH_LIST_OF_OBJECTS)
+        f = Flatson(schema=schema)
+        lines = [json.dumps(SAMPLE_WITH_LIST_OF_OBJECTS), '  ', '{"first": "bye"}']
+
+        result = list(f.flatten_stream(io.StringIO('\n'.join(lines))))
+
+        self.assertEquals([f.flatten(SAMPLE_WITH_LIST_OF_OBJECTS), ['bye', 'null']], result)
+
+    def test_flatten_file(self):
+        # given:
+        schema = skinfer.generate_schema(SAMPLE_WITH_LIST_OF_OBJECTS)
+        f = Flatson(schema=schema)
+        data = [{'first': '%03d' % i, 'list': [{'key1': str(i)}]} for i in range(40)]
+        fd, path = tempfile.mkstemp()
+        with os.fdopen(fd, 'wb') as jl:
+            jl.write('\n'.join(json.dumps(obj) for obj in data).encode('utf-8'))
+        self.addCleanup(os.remove, path)
+        expected = [f.flatten(obj) for obj in data]
+
+        # when:
+        in_process = list(f.flatten_file(path, workers=1))
+        in_pool = list(f.flatten_file(path, workers=3, range_size=50))
+
+        # then:
+        self.assertEquals(expected, in_process)
+        self.assertEquals(expected, in_pool)
+
+    def test_collect_stats(self):
+        # given:
+        sample = {'first': 'hello', 'list': ['one', 'two', 'three']}
+        schema = skinfer.generate_schema(sample)
+        f = Flatson(schema=schema)
+
+        for flatson in (f, Flatson(schema=schema).compile()):
+            # when:
+            stats = flatson.enable_stats()
+            flatson.flatten(sample)
+            flatson.flatten_dict({'list': []})
+            flatson.flatten({})
+            self.assertEquals([None, '5'], flatson.flatten({'list': 5}))
+
+            # then:
+            self.assertEquals(4, stats.records)
+            self.assertEquals(3, stats['first'].missing)
+            self.assertEquals(0, stats['first'].serializer_calls)
+            self.assertEquals(1, stats['list'].missing)
+            self.assertEquals(4, stats['list'].serializer_calls)
+            self.assertEquals({0: 1, 4: 1}, stats['list'].array_lengths)
+
+            # and when:
+            self.assertTrue(flatson.disable_stats() is stats)
+            flatson.flatten(sample)
+
+            # then:
+            self.assertEquals(None, flatson.stats)
+            self.assertEquals(4, stats.records)
+            self.assertEquals(['hello', '["one","two","three"]'], flatson.flatten(sample))
+
+    def test_collect_stats_in_parallel(self):
+        schema = skinfer.generate_schema(SAMPLE_WITH_LIST_OF_OBJECTS)
+        f = Flatson(schema=schema)
+        stats = f.enable_stats()
+        f.flatten({})
+        data = [SAMPLE_WITH_LIST_OF_OBJECTS, {'first': 'x'}] * 10
+
+        list(f.flatten_parallel(data, workers=2, chunksize=3))
+
+        self.assertEquals(21, stats.records)
+        self.assertEquals(1, stats['first'].missing)
+        self.assertEquals(11, stats['list'].missing)
+        self.assertEquals({2: 10}, stats['list'].array_lengths)
+
+    def test_explode_array_of_objects(self):
+        # given:
+        sample = {
+            'first': 'hello',
+            'list': [{'key1': 'value1', 'key2': ['a']}, {'key1': 'value3', 'key2': []}],
+            'tags': ['one'],
+        }
+        schema = skinfer.generate_schema(sample)
+        f = Flatson(schema=schema)
+
+        # when:
+        exploded = f.explode('list')
+        result = exploded.flatten(sample)
+
+        # then:
+        self.assertEquals(['first', 'list.key1', 'list.key2', 'tags'], exploded.fieldnames)
+        self.assertFalse(isinstance(result, list))
+        self.assertEquals([['hello', 'value1', '["a"]', '["one"]'],
+                           ['hello', 'value3', '[]', '["one"]']], list(result))
+        self.assertEquals([['hello', None, None, '[]']],
+                          list(exploded.flatten({'first': 'hello', 'list': [], 'tags': []})))
+        self.assertEquals([{'first': None, 'list.key1': None, 'list.key2': None, 'tags': 'null'}],
+                          list(exploded.flatten_dict({})))
+
+    def test_explode_several_arrays(self):
+        # given:
+        sample = {'first': 'hello', 'list': [1, 2, 3], 'tags': ['a', 'b']}
+        schema = skinfer.generate_schema(sample)
+        schema['properties']['tags']['flatson_serialize'] = dict(method='join_values')
+        f = Flatson(schema=schema)
+
+        # when:
+        exploded = f.explode('list', 'tags')
+
+        # then:
+        self.assertEquals(['first', 'list', 'tags'], exploded.fieldnames)
+        self.assertEquals([['hello', 1, 'a'], ['hello', 1, 'b'],
+                           ['hello', 2, 'a'], ['hello', 2, 'b'],
+                           ['hello', 3, 'a'], ['hello', 3, 'b']],
+                          list(exploded.flatten(sample)))
+        self.assertEquals([['hello', None, 'a']],
+                          list(exploded.flatten({'first': 'hello', 'tags': ['a']})))
+
+    def test_explode_values_not_arrays_nor_objects(self):
+        schema = {'type': 'object', 'properties': {
+            'tags': {'type': 'array', 'items': {'type': 'string'}},
+            'list': {'type': 'array', 'items': {'type': 'object', 'properties': {
+                'key': {'type': 'string'},
+                'sub': {'type': 'object', 'properties': {'a': {'type': 'integer'}}},
+            }}},
+        }}
+        f = Flatson(schema=schema)
+
+        self.assertEquals([[None, None, 'abc']],
+                          list(f.explode('tags', 'list').flatten({'tags': 'abc'})))
+        self.assertEquals([['x', 1, 'null'], [None, None, 'null'], ['y', None, 'null']],
+                          list(f.explode('list').flatten({'list': [
+                              {'key': 'x', 'sub': {'a': 1}}, 'oops', {'key': 'y', 'sub': 'z'}]})))
+
+    def test_explode_only_array_fields(self):
+        f = Flatson(schema=skinfer.generate_schema(SAMPLE_WITH_LIST_OF_OBJECTS))
+        with self.assertRaises(ValueError):
+            f.explode('first')
+        with self.assertRaises(ValueError):
+            f.explode('nope')
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals, print_function, absolute_import
+
+"""
+test_inference
+----------------------------------
+
+Tests for `flatson.inference` module.
+"""
+
+import json
+import pickle
+import unittest
+
+from flatson import Flatson
+from flatson.inference import SCHEMA_URI, SchemaSummary, infer_schema
+
+
+OBJECTS = [
+    {'name': 'Claudio', 'age': 42, 'address': {'city': 'Paris'}, 'skills': ['hacking']},
+    {'name': 'Salazar', 'age': 42.5, 'address': {'city': 'Recife', 'zip': '50000'},
+     'skills': [], 'alive': True},
+    {'name': None, 'address': {'city': 'Rome'}, 'skills': [{'name': 'soccer'}]},
+]
+
+
+class TestSchemaInference(unittest.TestCase):
+    def test_infer_schema(self):
+        expected = {
+            '$schema': SCHEMA_URI,
+            'type': 'object',
+            'properties': {
+                'name': {'type': ['string', 'null']},
+                'age': {'type': 'number'},
+                'alive': {'type': 'boolean'},
+                'address': {
+                    'type': 'object',
+                    'properties': {'city': {'type': 'string'}, 'zip': {'type': 'string'}},
+                    'required': ['city'],
+                },
+                'skills': {
+                    'type': 'array',
+                    'items': {'type': ['object', 'string'],
+                              'properties': {'name': {'type': 'string'}},
+                              'required': ['name']},
+                },
+            },
+            'required': ['address', 'name', 'skills'],
+        }
+        self.assertEquals(expected, infer_schema(OBJECTS))
+
+    def test_integers_and_empty_arrays(self):
+        schema = infer_schema([{'a': 1, 'b': []}, {'a': 2, 'b': []}])
+        self.assertEquals({'type': 'integer'}, schema['properties']['a'])
+        self.assertEquals({'type': 'array'}, schema['properties']['b'])
+
+    def test_merge_summaries(self):
+        # given:
+        first = SchemaSummary().update(OBJECTS[:1])
+        second = SchemaSummary().update(OBJECTS[1:])
+
+        # when:
+        merged = SchemaSummary().merge(first).merge(pickle.loads(pickle.dumps(second)))
+
+        # then:
+        self.assertEquals(3, merged.count)
+        self.assertEquals(infer_schema(OBJECTS), merged.to_schema())
+
+    def test_schema_can_be_used_by_flatson(self):
+        f = Flatson(infer_schema(OBJECTS))
+        self.assertEquals(['address.city', 'address.zip', 'age', 'alive', 'name', 'skills'],
+                          f.fieldnames)
+        self.assertEquals(['Paris', None, 42, None, 'Claudio', '["hacking"]'],
+                          f.flatten(OBJECTS[0]))
+
+    def test_nullable_values_can_be_flattened(self):
+        # given:
+        objects = [{'a': {'x': 1}, 't': [1], 's': 'x'}, {'a': None, 't': None, 's': None}]
+
+        # when:
+        schema = infer_schema(objects)
+        f = Flatson(schema)
+
+        # then:
+        self.assertEquals(['object', 'null'], schema['properties']['a']['type'])
+        self.assertEquals(['a.x', 's', 't'], f.fieldnames)
+        self.assertEquals([[1, 'x', '[1]'], [None, None, 'null']],
+                          [f.flatten(obj) for obj in objects])
+        self.assertEquals([None, None, 'null'], f.compile().flatten(objects[1]))
+        self.assertEquals([None, None, 'null'], f.flatten_bytes(json.dumps(objects[1])))
+
+    def test_mixed_types_can_be_flattened(self):
+        # given:
+        objects = [{'a': {'x': 1}, 't': ['b.png', 'c.png'], 'n': 1},
+                   {'a': 'none', 't': 'none', 'n': [2]},
+                   {'a': None, 't': None, 'n': {'y': 3}}]
+
+        # when:
+        schema = infer_schema(objects)
+        f = Flatson(schema)
+
+        # then:
+        self.assertEquals(['object', 'string', 'null'], schema['properties']['a']['type'])
+        self.assertEquals(['array', 'string', 'null'], schema['properties']['t']['type'])
+        self.assertEquals(3, len(schema['properties']['n']['anyOf']))
+        self.assertEquals(['a.x', 'n', 't'], f.fieldnames)
+        expected = [[1, 1, '["b.png","c.png"]'], [None, [2], '"none"'], [None, {'y': 3}, 'null']]
+        self.assertEquals(expected, [f.flatten(obj) for obj in objects])
+        self.assertEquals(expected, [f.flatten_bytes(json.dumps(obj)) for obj in objects])
+        self.assertEquals(expected, [f.compile().flatten(obj) for obj in objects])
+
+    def test_empty_and_invalid_input(self):
+        self.assertEquals({'$schema': SCHEMA_URI, 'type': 'object', 'properties': {}},
+                          infer_schema([]))
+        with self.assertRaises(ValueError):
+            infer_schema([['not', 'an', 'object']])
+        with self.assertRaises(ValueError):
+            infer_schema([{'a': object()}])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals, print_function, absolute_import
+
+import os
+import tempfile
+import unittest
+
+from flatson.jsonlines import iter_lines, open_mmap, split_file, split_ranges
+
+DATA = b'{"a": 1}\n{"a": 22}\n\n{"a": 333}\n{"a": 4}'
+
+
+class TestJsonLines(unittest.TestCase):
+    def test_split_ranges_on_newlines(self):
+        ranges = split_ranges(DATA, 10)
+        self.assertEqual([(0, 19), (19, 31), (31, 39)], ranges)
+        self.assertEqual(b''.join(DATA[start:end] for start, end in ranges), DATA)
+        self.assertTrue(all(DATA[end - 1:end] == b'\n' for _, end in ranges[:-1]))
+
+    def test_split_ranges_bigger_than_data(self):
+        self.assertEqual([(0, len(DATA))], split_ranges(DATA, 1000))
+        self.assertEqual([], split_ranges(b''))
+
+    def test_split_ranges_invalid_size(self):
+        with self.assertRaises(ValueError):
+            split_ranges(DATA, 0)
+
+    def test_iter_lines(self):
+        self.assertEqual([b'{"a": 1}', b'{"a": 22}', b'{"a": 333}', b'{"a": 4}'],
+                         list(iter_lines(DATA)))
+        self.assertEqual([b'{"a": 22}'], list(iter_lines(DATA, 9, 20)))
+
+    def test_iter_lines_of_ranges(self):
+        for size in range(1, 12):
+            lines = [line for start, end in split_ranges(DATA, size)
+                     for line in iter_lines(DATA, start, end)]
+            self.assertEqual(list(iter_lines(DATA)), lines)
+
+    def test_split_file(self):
+        fd, path = tempfile.mkstemp()
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(DATA)
+            self.assertEqual(split_ranges(DATA, 10), split_file(path, 10))
+            with open_mmap(path) as mm:
+                self.assertEqual(list(iter_lines(DATA)), list(iter_lines(mm, 0, len(mm))))
+
+            open(path, 'wb').close()
+            self.assertEqual([], split_file(path))
+        finally:
+            os.remove(path)
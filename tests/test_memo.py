@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals, print_function, absolute_import
+
+import pickle
+import unittest
+
+from flatson import Flatson
+from flatson.encoders import dumps_stdlib
+from flatson.memo import MemoizedSerializer
+
+SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'name': {'type': 'string'},
+        'tags': {'type': 'array', 'items': {'type': 'string'},
+                 'flatson_serialize': {'method': 'join_values', 'separator': '|'}},
+        'sizes': {'type': 'array'},
+    },
+}
+
+
+class TestMemoizedSerializer(unittest.TestCase):
+    def test_remember_serialized_values(self):
+        calls = []
+        serialize = MemoizedSerializer(lambda v: calls.append(v) or len(calls), maxsize=2)
+
+        results = [serialize(v) for v in (['a'], ['a'], ['b'], ['a'], ['c'], ['b'])]
+
+        self.assertEqual([1, 1, 2, 1, 3, 4], results)
+        self.assertEqual([['a'], ['b'], ['c'], ['b']], calls)
+        self.assertEqual({'hits': 2, 'misses': 4, 'size': 2}, serialize.as_dict())
+
+    def test_tell_apart_values_equal_in_python(self):
+        serialize = MemoizedSerializer(dumps_stdlib)
+        values = [[1], [1.0], [True], [0.0], [-0.0], [{'a': 1}], [{'a': True}], ['1'],
+                  [{'a': '1'}], [{'a': '1', 'b': 'x'}], [None],
+                  [], [{}], [[]], ['a', 'b'], 'ab', [1, '1'], ['1', 1]]
+        self.assertEqual([dumps_stdlib(v) for v in values], [serialize(v) for v in values])
+        self.assertEqual(0, serialize.hits)
+
+    def test_pickle_without_memo(self):
+        serialize = MemoizedSerializer(dumps_stdlib, maxsize=10)
+        serialize([1])
+        copy = pickle.loads(pickle.dumps(serialize))
+        self.assertEqual((0, 10), (len(copy), copy.maxsize))
+        self.assertEqual('[1]', copy([1]))
+
+
+class TestFlatsonMemoization(unittest.TestCase):
+    def test_flatten_memoized(self):
+        # given:
+        f = Flatson(SCHEMA, memoize=100)
+        plain = Flatson(SCHEMA)
+        objects = [{'name': str(i), 'tags': ['x', 'y'], 'sizes': [i % 2]} for i in range(10)]
+
+        # when:
+        rows = [f.flatten(obj) for obj in objects]
+
+        # then:
+        self.assertEqual([plain.flatten(obj) for obj in objects], rows)
+        self.assertEqual(rows, [f.compile().flatten(obj) for obj in objects])
+        stats = f.memoization_stats()
+        self.assertEqual(['sizes', 'tags'], list(stats))
+        self.assertEqual({'hits': 18, 'misses': 2, 'size': 2}, stats['sizes'])
+        self.assertEqual({'hits': 19, 'misses': 1, 'size': 1}, stats['tags'])
+        self.assertEqual({}, plain.memoization_stats())
+
+    def test_memoize_registered_serialization_methods(self):
+        schema = {'type': 'object', 'properties': {
+            'tags': {'type': 'array', 'flatson_serialize': {'method': 'custom'}}}}
+        f = Flatson(schema, memoize=10)
+        f.register_serialization_method('custom', lambda v: '-'.join(v))
+
+        self.assertEqual(['a-b'], f.flatten({'tags': ['a', 'b']}))
+        self.assertEqual(['a-b'], f.flatten({'tags': ['a', 'b']}))
+        self.assertEqual({'hits': 1, 'misses': 1, 'size': 1}, f.memoization_stats()['tags'])
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals, print_function, absolute_import
+
+import unittest
+
+from flatson import FlatsonRouter
+
+SCHEMAS = {
+    'product': {'type': 'object', 'properties': {
+        'name': {'type': 'string'}, 'price': {'type': 'number'}}},
+    'review': {'type': 'object', 'properties': {
+        'text': {'type': 'string'}, 'meta': {'type': 'object', 'properties': {
+            'type': {'type': 'string'}}}}},
+}
+
+RECORDS = [
+    {'meta': {'type': 'product'}, 'name': 'chair', 'price': 10},
+    {'meta': {'type': 'review'}, 'text': 'nice'},
+    {'meta': {'type': 'seller'}, 'name': 'Joe'},
+    {'meta': {'type': 'product'}, 'name': 'table'},
+]
+
+
+class TestFlatsonRouter(unittest.TestCase):
+    def test_route_by_field_path(self):
+        router = FlatsonRouter('meta.type', SCHEMAS, skip_unknown=True)
+
+        result = list(router.route(RECORDS))
+
+        self.assertEqual([('product', ['chair', 10]),
+                          ('review', ['review', 'nice']),
+                          ('product', ['table', None])], result)
+        self.assertEqual(['meta.type', 'text'], router.fieldnames('review'))
+
+    def test_route_by_callable(self):
+        router = FlatsonRouter(lambda obj: 'product' if 'price' in obj else 'review', SCHEMAS)
+        self.assertEqual(('review', [None, 'good']), router.flatten({'text': 'good'}))
+
+    def test_unknown_record_type(self):
+        router = FlatsonRouter(['meta', 'type'], SCHEMAS)
+        with self.assertRaises(ValueError):
+            list(router.route(RECORDS))
+
+    def test_dispatch_to_sinks(self):
+        router = FlatsonRouter('meta.type', SCHEMAS, skip_unknown=True)
+        products, reviews = [], []
+
+        counts = router.dispatch(RECORDS, {'product': products.append,
+                                           'review': reviews.append})
+
+        self.assertEqual({'product': 2, 'review': 1}, counts)
+        self.assertEqual([['chair', 10], ['table', None]], products)
+        self.assertEqual([['review', 'nice']], reviews)
+
+    def test_dispatch_to_sinks_opened_on_demand(self):
+        router = FlatsonRouter('meta.type', SCHEMAS, skip_unknown=True)
+        outputs = {}
+
+        def open_sink(record_type, flatson):
+            outputs[record_type] = [flatson.fieldnames]
+            return outputs[record_type].append
+
+        router.dispatch(RECORDS, open_sink)
+
+        self.assertEqual({'product': [['name', 'price'], ['chair', 10], ['table', None]],
+                          'review': [['meta.type', 'text'], ['review', 'nice']]}, outputs)
+
+    def test_bounded_cache_of_flatteners(self):
+        router = FlatsonRouter('meta.type', SCHEMAS, maxsize=1, skip_unknown=True, memoize=4)
+        list(router.route(RECORDS))
+        product = router.flatson_for('product')
+        self.assertEqual(4, product.memoize)
+        self.assertTrue(router.flatson_for('product') is product)
+        router.flatson_for('review')
+        self.assertFalse(router.flatson_for('product') is product)
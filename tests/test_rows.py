@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals, print_function, absolute_import
+
+"""
+test_rows
+----------------------------------
+
+Tests for `flatson.rows` module.
+"""
+
+import pickle
+import unittest
+from collections import OrderedDict
+
+from flatson.rows import LazyRow, Row, RowLayout
+
+
+class TestRow(unittest.TestCase):
+    def setUp(self):
+        self.layout = RowLayout(['address.city', 'age', 'name'])
+        self.row = Row(self.layout, ('Paris', 42, 'Claudio'))
+
+    def test_access_by_position_and_name(self):
+        self.assertEquals('Paris', self.row[0])
+        self.assertEquals((42, 'Claudio'), self.row[1:])
+        self.assertEquals('Claudio', self.row[-1])
+        self.assertEquals(42, self.row['age'])
+        self.assertEquals('Paris', self.row.get('address.city'))
+        self.assertEquals('x', self.row.get('nope', 'x'))
+        with self.assertRaises(KeyError):
+            self.row['nope']
+        with self.assertRaises(IndexError):
+            self.row[3]
+
+    def test_sequence_protocol(self):
+        self.assertEquals(3, len(self.row))
+        self.assertEquals(['Paris', 42, 'Claudio'], list(self.row))
+        self.assertTrue(42 in self.row)
+
+    def test_convert_to_dict(self):
+        self.assertEquals(['address.city', 'age', 'name'], self.row.keys())
+        self.assertEquals({'address.city': 'Paris', 'age': 42, 'name': 'Claudio'},
+                          self.row.as_dict())
+        self.assertEquals(OrderedDict(self.row.items()), self.row.as_ordered_dict())
+
+    def test_equality_and_pickle(self):
+        self.assertEquals(Row(RowLayout(self.layout.fieldnames), ('Paris', 42, 'Claudio')),
+                          self.row)
+        self.assertNotEquals(Row(self.layout, ('Paris', 42, None)), self.row)
+        self.assertNotEquals(Row(RowLayout(['a', 'b', 'c']), self.row.values), self.row)
+        self.assertEquals(self.row, pickle.loads(pickle.dumps(self.row)))
+
+    def test_rows_share_layout(self):
+        other = Row(self.layout, ('Rome', 10, 'Salazar'))
+        self.assertTrue(other.layout.index is self.row.layout.index)
+        self.assertFalse(hasattr(self.row, '__dict__'))
+
+
+class _Field(object):
+    def __init__(self, key, serialize=None):
+        self.key = key
+        self.serialize = serialize
+
+    def getter(self, obj):
+        return obj.get(self.key)
+
+
+class TestLazyRow(unittest.TestCase):
+    def setUp(self):
+        self.serialized = []
+
+        def serialize(value):
+            self.serialized.append(value)
+            return ','.join(value)
+
+        self.layout = RowLayout(['name', 'tags'])
+        self.fields = [_Field('name'), _Field('tags', serialize)]
+        self.obj = {'name': 'Claudio', 'tags': ['a', 'b']}
+
+    def test_computes_values_on_access(self):
+        row = LazyRow(self.layout, self.obj, self.fields)
+        self.assertEquals(0, row.computed())
+        self.assertEquals('Claudio', row['name'])
+        self.assertEquals([], self.serialized)
+        self.assertEquals('a,b', row[-1])
+        self.assertEquals('a,b', row.get('tags'))
+        self.assertEquals([['a', 'b']], self.serialized)
+        self.assertEquals(2, row.computed())
+        with self.assertRaises(IndexError):
+            row[2]
+
+    def test_behaves_like_row(self):
+        row = LazyRow(self.layout, self.obj, self.fields, coerce=lambda i, v: v.upper())
+        expected = Row(self.layout, ('CLAUDIO', 'A,B'))
+        self.assertEquals(expected, row)
+        self.assertEquals(['CLAUDIO', 'A,B'], list(row))
+        self.assertEquals(('A,B',), row[1:])
+        self.assertEquals(expected.as_dict(), row.as_dict())
+        self.assertEquals(expected, pickle.loads(pickle.dumps(row)))
+
+
+if __name__ == '__main__':
+    unittest.main()
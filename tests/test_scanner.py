@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals, print_function, absolute_import
+
+"""
+test_scanner
+----------------------------------
+
+Tests for `flatson.scanner` module.
+"""
+
+import json
+import unittest
+
+from flatson.scanner import build_path_trie, decode_paths
+
+
+SAMPLE = {
+    'name': 'Zé "the \\ hacker"',
+    'html': '<div class="main">{[(</div>' * 10,
+    'address': {'city': 'Paris', 'street': 'Rue de Sevres', 'geo': [1.5, -2e10]},
+    'skills': [{'name': 'hacking', 'tags': [[], {}]}, {'name': '}]'}],
+    'age': 42,
+    'alive': True,
+    'spouse': None,
+    'ke\\"y': {'a': 1},
+}
+
+
+class TestDecodePaths(unittest.TestCase):
+    def test_build_path_trie(self):
+        trie = build_path_trie([('a',), ('b', 'c'), ('b', 'd', 'e')])
+        self.assertEquals({'a': None, 'b': {'c': None, 'd': {'e': None}}}, trie)
+
+    def test_build_path_trie_keeps_whole_values(self):
+        self.assertEquals({'a': None}, build_path_trie([('a',), ('a', 'b')]))
+        self.assertEquals({'a': None}, build_path_trie([('a', 'b'), ('a',)]))
+
+    def test_decode_only_keys_in_paths(self):
+        # given:
+        trie = build_path_trie([('name',), ('address', 'city'), ('address', 'zip'),
+                                ('skills',), ('spouse',), ('alive', 'x'), ('ke\\"y', 'a')])
+
+        for text in (json.dumps(SAMPLE), json.dumps(SAMPLE, indent=2),
+                     json.dumps(SAMPLE, separators=(',', ':'), ensure_ascii=False)):
+            # when:
+            result = decode_paths(text, trie)
+
+            # then:
+            expected = {
+                'name': SAMPLE['name'],
+                'address': {'city': 'Paris'},
+                'skills': SAMPLE['skills'],
+                'spouse': None,
+                'alive': True,
+                'ke\\"y': {'a': 1},
+            }
+            self.assertEquals(expected, result)
+
+    def test_skip_strings_with_many_escapes(self):
+        html = '<a href="/x">\\</a>\n' * 3000
+        obj = {'html': html, 'pages': [html, {'html': html}], 'name': 'x'}
+        trie = build_path_trie([('name',)])
+        self.assertEquals({'name': 'x'}, decode_paths(json.dumps(obj), trie))
+        for text in ('{"b":"%s}' % ('\\"' * 20), '{"b":["%s]}' % ('\\"' * 2000)):
+            with self.assertRaises(ValueError):
+                decode_paths(text, trie)
+
+    def test_decode_empty_object(self):
+        self.assertEquals({}, decode_paths(' { } ', build_path_trie([('a',)])))
+
+    def test_invalid_json(self):
+        trie = build_path_trie([('a',)])
+        for text in ('', '[1]', '{"a":1', '{"a" 1}', '{"a":1} x', '{"b":[1,2}',
+                     '{"b":"x}', '{"b":[{"c":1}', '{"a":tru}'):
+            with self.assertRaises(ValueError):
+                decode_paths(text, trie)
+
+
+if __name__ == '__main__':
+    unittest.main()
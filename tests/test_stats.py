@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals, print_function, absolute_import
+
+"""
+test_stats
+----------------------------------
+
+Tests for `flatson.stats` module.
+"""
+
+import pickle
+import unittest
+
+from flatson.stats import FlatsonStats, length_bucket
+
+
+class TestStats(unittest.TestCase):
+    def test_length_bucket(self):
+        self.assertEquals([0, 1, 2, 4, 4, 8, 8, 1024],
+                          [length_bucket(n) for n in (0, 1, 2, 3, 4, 5, 8, 1000)])
+
+    def test_merge_and_reset(self):
+        # given:
+        stats = FlatsonStats(['a', 'b'])
+        stats.records = 2
+        stats['a'].missing = 1
+        stats['b'].add_array_length(3)
+        other = FlatsonStats(['a', 'b', 'c'])
+        other.records = 3
+        other['a'].time = 0.5
+        other['b'].add_array_length(4)
+        other['b'].serializer_calls = 3
+        other['c'].missing = 2
+
+        # when:
+        stats.merge(pickle.loads(pickle.dumps(other)))
+
+        # then:
+        self.assertEquals(5, stats.records)
+        self.assertEquals(['a', 'b', 'c'], list(stats.fields))
+        self.assertEquals({'name': 'a', 'time': 0.5, 'missing': 1, 'serializer_calls': 0,
+                           'array_lengths': {}}, stats['a'].as_dict())
+        self.assertEquals({4: 2}, stats['b'].array_lengths)
+        self.assertEquals(3, stats['b'].serializer_calls)
+        self.assertEquals(2, stats['c'].missing)
+
+        # and when:
+        stats.reset()
+
+        # then:
+        self.assertEquals(0, stats.records)
+        self.assertEquals({'name': 'b', 'time': 0.0, 'missing': 0, 'serializer_calls': 0,
+                           'array_lengths': {}}, stats['b'].as_dict())
+
+
+if __name__ == '__main__':
+    unittest.main()